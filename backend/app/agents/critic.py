@@ -1,37 +1,42 @@
 from __future__ import annotations
 import asyncio
 from ..observability.events import bus, make_event
-from ..observability.metrics import record_groq_usage, record_groq_error
+from ..observability.metrics import record_groq_error
 from ..config import settings
 from ..graph.state import GraphState
+from ..graph.budget import StageClock, clamp_timeout, remaining
 from ..llm.groq_client import chat
 
-def _delay() -> float:
-    return (getattr(settings, "SIM_DELAY_MS", 600) / 1000)
+def _delay(state: GraphState) -> float:
+    return min(getattr(settings, "SIM_DELAY_MS", 600) / 1000, remaining(state))
 
 async def critic_node(state: GraphState) -> GraphState:
     run_id = state.get("run_id", "unknown")
     await bus.publish(make_event(run_id, "critique", "started", agent="critic"))
+    clock = StageClock(state, "critique")
 
     critique = "Check for outdated sources; add quantitative evidence if available. (stub)"
 
-    if settings.GROQ_API_KEY:
+    if settings.GROQ_API_KEY and remaining(state) > 1:
         try:
             sys = (
                 "You are a rigorous, concise reviewer. Provide 2–4 bullet critique points "
                 "to strengthen the brief. Be specific and actionable."
             )
             usr = state.get("report_md", "# (empty)")
-            text, pt, ct = await chat(
+            text, _, _ = await chat(
                 [{"role": "system", "content": sys}, {"role": "user", "content": usr}],
                 temperature=0.3,
                 max_tokens=220,
+                agent="critic",
+                priority=state.get("limits", {}).get("priority", 1),
+                timeout=clamp_timeout(state, "critique", settings.GROQ_TIMEOUT),
             )
-            record_groq_usage(settings.GROQ_MODEL, "critic", pt, ct)
             critique = text.strip() or critique
         except Exception:
             record_groq_error(settings.GROQ_MODEL, "critic")
 
-    await asyncio.sleep(_delay())
-    await bus.publish(make_event(run_id, "critique", "completed", agent="critic", data={"notes": 1}))
-    return {**state, "critique": critique}
+    await asyncio.sleep(_delay(state))
+    await bus.publish(make_event(run_id, "critique", "completed", agent="critic",
+                                 duration_ms=clock.elapsed_ms, data=clock.report({"notes": 1})))
+    return {"critique": critique}
@@ -2,13 +2,14 @@ from __future__ import annotations
 import asyncio, re
 from typing import List
 from ..observability.events import bus, make_event
-from ..observability.metrics import record_groq_usage, record_groq_error
+from ..observability.metrics import record_groq_error
 from ..config import settings
 from ..graph.state import GraphState
+from ..graph.budget import StageClock, clamp_timeout, remaining
 from ..llm.groq_client import chat
 
-def _delay() -> float:
-    return (getattr(settings, "SIM_DELAY_MS", 600) / 1000)
+def _delay(state: GraphState) -> float:
+    return min(getattr(settings, "SIM_DELAY_MS", 600) / 1000, remaining(state))
 
 def _parse_plan(text: str) -> List[str]:
     lines = []
@@ -26,16 +27,18 @@ async def planner_node(state: GraphState) -> GraphState:
     run_id = state.get("run_id", "unknown")
     topic = state.get("topic", "")
     await bus.publish(make_event(run_id, "plan", "started", agent="planner", message=f"Planning: {topic}"))
+    clock = StageClock(state, "plan")
 
     plan: List[str]
-    if settings.GROQ_API_KEY:
+    if settings.GROQ_API_KEY and remaining(state) > 1:
         try:
             messages = [
                 {"role": "system", "content": "You are a precise research planner. Output 3–6 short, actionable steps."},
                 {"role": "user", "content": f"Topic: {topic}\nDepth: {state.get('depth','standard')}\nDomains: {', '.join(state.get('domains', []))}"}
             ]
-            text, pt, ct = await chat(messages, max_tokens=300, temperature=0.1)
-            record_groq_usage(settings.GROQ_MODEL, "planner", pt, ct)
+            text, _, _ = await chat(messages, max_tokens=300, temperature=0.1, agent="planner",
+                                    priority=state.get("limits", {}).get("priority", 1),
+                                    timeout=clamp_timeout(state, "plan", settings.GROQ_TIMEOUT))
             plan = _parse_plan(text) or [
                 "Clarify scope",
                 "Collect high-quality sources",
@@ -58,6 +61,7 @@ async def planner_node(state: GraphState) -> GraphState:
             "Synthesize into a brief report with citations",
         ]
 
-    await asyncio.sleep(_delay())
-    await bus.publish(make_event(run_id, "plan", "completed", agent="planner", data={"steps": len(plan)}))
-    return {**state, "plan": plan}
+    await asyncio.sleep(_delay(state))
+    await bus.publish(make_event(run_id, "plan", "completed", agent="planner",
+                                 duration_ms=clock.elapsed_ms, data=clock.report({"steps": len(plan)})))
+    return {"plan": plan}
@@ -4,28 +4,31 @@ from datetime import datetime
 from ..observability.events import bus, make_event
 from ..config import settings
 from ..graph.state import GraphState
-from ..storage.files import write_text
+from ..graph.budget import StageClock, clamp_timeout, remaining
+from ..storage.artifacts import write_artifact
 from ..integration.n8n import notify_n8n
 
-def _delay() -> float:
-    return (getattr(settings, "SIM_DELAY_MS", 600) / 1000)
+def _delay(state: GraphState) -> float:
+    return min(getattr(settings, "SIM_DELAY_MS", 600) / 1000, remaining(state))
 
 async def presenter_node(state: GraphState) -> GraphState:
     run_id = state.get("run_id", "unknown")
     await bus.publish(make_event(run_id, "present", "started", agent="presenter"))
+    clock = StageClock(state, "present")
 
     md = state.get("report_md", "# Empty Report\n")
-    path = write_text(run_id, "report.md", md)
+    path = await write_artifact(run_id, "report.md", md, media_type="text/markdown")
 
-    await asyncio.sleep(_delay())
-    await bus.publish(make_event(run_id, "present", "completed", agent="presenter", data={"path": path}))
+    await asyncio.sleep(_delay(state))
+    await bus.publish(make_event(run_id, "present", "completed", agent="presenter",
+                                 duration_ms=clock.elapsed_ms, data=clock.report({"path": path})))
 
     payload = {
         "run_id": run_id,
         "topic": state.get("topic"),
         "depth": state.get("depth"),
         "plan": state.get("plan", []),
-        "sources": [d["url"] for d in state.get("docs", []) if d.get("url")],
+        "sources": [u for d in state.get("docs", []) if d.get("url") for u in [d["url"], *d.get("mirrors", [])]],
         "report_md": md,
         "critique": state.get("critique"),
         "artifact_path": path,
@@ -35,7 +38,8 @@ async def presenter_node(state: GraphState) -> GraphState:
     }
 
     await bus.publish(make_event(run_id, "notify", "started", agent="n8n", message="Sending to n8n webhook"))
-    result = await notify_n8n(payload)
+    # the presenter always runs, so the webhook gets at least a short window past the deadline
+    result = await notify_n8n(payload, timeout=clamp_timeout(state, "present", settings.N8N_TIMEOUT, floor=2.0))
     if result is None:
         await bus.publish(make_event(run_id, "notify", "completed", agent="n8n", message="N8N_WEBHOOK_URL not set", data={"skipped": True}))
     else:
@@ -48,4 +52,4 @@ async def presenter_node(state: GraphState) -> GraphState:
             info["response"] = (text[:240] + "…") if len(text) > 240 else text
         await bus.publish(make_event(run_id, "notify", status_label, agent="n8n", data=info))
 
-    return {**state, "artifacts": {"report_md": path}}
+    return {"artifacts": {"report_md": path}}
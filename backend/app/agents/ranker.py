@@ -0,0 +1,62 @@
+from __future__ import annotations
+from typing import Dict, List
+import numpy as np
+from ..observability.events import bus, make_event
+from ..graph.state import GraphState
+from ..graph.budget import StageClock
+from ..storage.blobs import read_doc
+from ..tools.bm25 import bm25
+
+_P_FETCH_OK = 0.8     # share of fetches that yield a usable page
+_FLOOR = 0.2          # prior relevance of a result that matches no query term
+_TARGET = 1.25        # expected useful docs wanted per source slot
+_MAX_BYTES = 20_000   # body prefix scored when re-ranking fetched docs
+
+def _queries(state: GraphState) -> tuple[List[str], List[float]]:
+    # the topic carries the ranking; plan steps add related vocabulary
+    plan = state.get("plan") or []
+    return [state.get("topic", "")] + plan, [1.0] + [0.5] * len(plan)
+
+def _normalized(scores: np.ndarray) -> np.ndarray:
+    top = float(scores.max()) if len(scores) else 0.0
+    return scores / top if top > 0 else np.zeros_like(scores)
+
+def fetch_window(values: np.ndarray, k: int) -> int:
+    """
+    Fewest fetches (best first) whose expected yield covers k sources with
+    some slack, between k and 2k.
+    """
+    need = k * _TARGET
+    n = int(np.searchsorted(np.cumsum(values), need) + 1)
+    return max(1, min(len(values), max(k, min(n, k * 2))))
+
+def rank_docs(state: GraphState, docs: List[Dict]) -> List[Dict]:
+    """
+    Fetched docs ordered by BM25 relevance of their body text. Reads the
+    stored bodies, so callers run it off the event loop.
+    """
+    if len(docs) < 2:
+        return list(docs)
+    run_id = state.get("run_id", "unknown")
+    queries, weights = _queries(state)
+    texts = [f"{d.get('title', '')} {read_doc(run_id, d, limit=_MAX_BYTES)}" for d in docs]
+    scores = bm25(texts, queries, weights)
+    return [docs[i] for i in np.argsort(-scores, kind="stable")]
+
+async def ranker_node(state: GraphState) -> GraphState:
+    run_id = state.get("run_id", "unknown")
+    await bus.publish(make_event(run_id, "rank", "started", agent="ranker"))
+    clock = StageClock(state, "rank")
+
+    results = state.get("results", [])
+    k = int(state.get("max_sources", 6))
+    queries, weights = _queries(state)
+    scores = bm25([f"{r.get('title', '')} {r.get('snippet', '')}" for r in results], queries, weights)
+    values = _P_FETCH_OK * (_FLOOR + (1 - _FLOOR) * _normalized(scores))
+    order = np.argsort(-values, kind="stable")
+    ranked = [{**results[i], "score": round(float(scores[i]), 3)} for i in order]
+    window = fetch_window(values[order], k) if ranked else 0
+
+    await bus.publish(make_event(run_id, "rank", "completed", agent="ranker", duration_ms=clock.elapsed_ms,
+                                 data=clock.report({"candidates": len(ranked), "fetch_window": window})))
+    return {"results": ranked, "fetch_window": window}
@@ -1,51 +1,262 @@
 from __future__ import annotations
-import asyncio
-from typing import List, Dict
-import httpx, trafilatura
-from bs4 import BeautifulSoup
+import asyncio, math
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, List, Dict, Tuple
+from ..config import settings
 from ..observability.events import bus, make_event
+from ..observability.metrics import record_fetch_bytes, record_fetch_cancelled, record_fetch_hedged
 from ..graph.state import GraphState
+from ..graph.budget import StageClock, clamp_timeout
+from ..storage.blobs import put_doc
+from ..storage.fingerprints import fingerprints
+from ..tools.fetcher import fetch_page
+from ..tools.extraction import extractor
+from ..tools.simhash import hamming
+from .ranker import rank_docs
 
 UA = "Mozilla/5.0 (HSCL-Capstone Fetcher)"
 
-def _extract_text(html: str) -> str:
-    txt = trafilatura.extract(html, include_comments=False) or ""
-    if not txt:
-        soup = BeautifulSoup(html, "lxml")
-        txt = soup.get_text(" ", strip=True)
-    return " ".join(txt.split())
-
-async def _fetch(url: str, client: httpx.AsyncClient) -> Dict | None:
+async def _fetch(url: str, timeout: float, ttl: float | None, meter: Dict[str, int], limits: Dict,
+                 dedup: bool) -> Dict | None:
     try:
-        r = await client.get(url, headers={"User-Agent": UA})
-        r.raise_for_status()
-        text = _extract_text(r.text)
+        page = await fetch_page(url, timeout=timeout, ttl=ttl, headers={"User-Agent": UA}, meter=meter,
+                                max_bytes=limits.get("max_bytes"), html_bytes=limits.get("html_bytes"))
+        if not page:
+            return None
+        text = " ".join(page["content"].split())
         if len(text) < 400:
             return None
-        return {"url": url, "title": "", "content": text}
+        doc = {"url": url, "title": page["title"], "content": text, "fp": None}
+        if dedup:
+            doc["fp"] = await extractor.fingerprint(text)
+            await asyncio.to_thread(fingerprints.put, url, doc["fp"])
+        return doc
     except Exception:
         return None
 
-async def retriever_node(state: GraphState) -> GraphState:
-    run_id = state.get("run_id", "unknown")
-    await bus.publish(make_event(run_id, "retrieve", "started", agent="retriever"))
+_EXTRA_WAIT_S = 2.0  # how long in-flight fetches may still add docs beyond max_sources
+
+# recent network fetch times (seconds), shared across runs
+_latencies: Deque[float] = deque(maxlen=256)
+
+def _hedge_after() -> float:
+    """
+    Seconds after which an in-flight fetch gets a backup: the HEDGE_PERCENTILE
+    of recent fetch times, inf until enough have been seen.
+    """
+    if not settings.HEDGE_ENABLED or len(_latencies) < max(1, settings.HEDGE_MIN_SAMPLES):
+        return math.inf
+    xs = sorted(_latencies)
+    p = xs[min(len(xs) - 1, int(settings.HEDGE_PERCENTILE * len(xs)))]
+    return max(settings.HEDGE_MIN_DELAY_S, p)
 
+@dataclass(eq=False)
+class _Fetch:
+    rank: int
+    fp: int | None  # fingerprint known from an earlier run
+    started: float
+    meter: Dict[str, int] = field(default_factory=dict)
+    hedged: bool = False
+    held: List[Tuple[int, str]] = field(default_factory=list)  # known mirrors waiting on this fetch
+
+def _merge(handle: Dict, url: str) -> None:
+    """
+    Fold a near-duplicate into a kept doc as a mirror citation.
+    """
+    if url != handle["url"] and url not in handle["mirrors"]:
+        handle["mirrors"].append(url)
+
+def _promote(rep: List, rank: int, better: Dict) -> None:
+    """
+    Make a better-ranked duplicate the source of kept doc `rep` ([fp, rank,
+    handle]); the previous source becomes a mirror.
+    """
+    handle = rep[2]
+    url = handle["url"]
+    handle.update(better)
+    if better["url"] in handle["mirrors"]:
+        handle["mirrors"].remove(better["url"])
+    _merge(handle, url)
+    rep[1] = rank
+
+async def iter_docs(
+    state: GraphState,
+    budget_s: float = math.inf,
+    stats: Dict | None = None,
+    limit: int | None = None,
+    keep_best: bool = False,
+) -> AsyncIterator[Dict]:
+    """
+    Yield blob handles of distinct usable docs, in completion order, until
+    max_sources are found, the results run out or budget_s elapses.
+    """
     limits = state.get("limits", {})
-    timeout = int(limits.get("fetch_timeout", 20))
+    timeout = clamp_timeout(state, "retrieve", int(limits.get("fetch_timeout", 20)))
+    ttl = limits.get("cache_ttl")
+    dedup = settings.DEDUP_ENABLED
+    max_distance = settings.SIMHASH_MAX_DISTANCE
+    stats = stats if stats is not None else {}
+    for key in ("duplicates", "hedged", "cancelled", "bytes", "wasted_bytes", "cancelled_bytes"):
+        stats.setdefault(key, 0)
 
     k = int(state.get("max_sources", 6))
-    results = state.get("results", [])[: max(1, k * 2)]
-    urls = [r["url"] for r in results if r.get("url")]
+    limit = max(k, limit or k)
+    candidates = deque((i, r["url"]) for i, r in enumerate(state.get("results", [])) if r.get("url"))
+    known = await asyncio.to_thread(fingerprints.get_many, [u for _, u in candidates]) if dedup else {}
+    run_id = state.get("run_id", "unknown")
+
+    loop = asyncio.get_running_loop()
+    deadline = None if math.isinf(budget_s) else loop.time() + budget_s
+    hedge_after = _hedge_after()
+    kept: List[List] = []  # [fp, rank, handle]
+    inflight: Dict[asyncio.Task, _Fetch] = {}
+    cancelled: List[_Fetch] = []
+
+    def near(fp: int) -> List | None:
+        return next((rep for rep in kept if hamming(rep[0], fp) <= max_distance), None)
+
+    def account(f: _Fetch, outcome: str) -> None:
+        n = f.meter.get("bytes", 0)
+        stats["bytes"] += n
+        if outcome != "used":
+            stats[f"{outcome}_bytes"] += n
+        record_fetch_bytes(outcome, n)
+
+    def launch(tg: asyncio.TaskGroup, n: int) -> None:
+        while n > 0 and candidates:
+            rank, url = candidates.popleft()
+            # a fingerprint known from an earlier run folds the URL into a kept
+            # doc without fetching, or parks it behind an in-flight twin
+            fp = known.get(url)
+            if fp is not None:
+                rep = near(fp)
+                if rep is not None:
+                    stats["duplicates"] += 1
+                    _merge(rep[2], url)
+                    continue
+                twin = next((f for f in inflight.values()
+                             if f.fp is not None and hamming(f.fp, fp) <= max_distance), None)
+                if twin is not None:
+                    twin.held.append((rank, url))
+                    continue
+            f = _Fetch(rank, fp, loop.time())
+            inflight[tg.create_task(_fetch(url, timeout, ttl, f.meter, limits, dedup))] = f
+            n -= 1
+
+    found = 0
+    closed = False
+    try:
+        # whatever is still in flight when the generator finishes or is closed
+        # is cancelled and awaited by the TaskGroup
+        async with asyncio.TaskGroup() as tg:
+            # ranked order, fetch_window at a time; failed and duplicate
+            # fetches are backfilled from the remaining results
+            launch(tg, int(state.get("fetch_window") or max(1, k * 2)))
+            try:
+                while inflight and found < limit:
+                    now = loop.time()
+                    if deadline is not None and now >= deadline:
+                        break
+                    wake = [deadline] if deadline is not None else []
+                    if candidates and found < k:
+                        wake += [f.started + hedge_after for f in inflight.values() if not f.hedged]
+                    until = min(wake, default=math.inf)
+                    timeout_s = None if math.isinf(until) else max(0.0, until - now)
+                    done, _ = await asyncio.wait(inflight, timeout=timeout_s, return_when=asyncio.FIRST_COMPLETED)
+
+                    for task in done:
+                        f = inflight.pop(task)
+                        d = task.result()
+                        if f.meter.get("bytes"):
+                            _latencies.append(loop.time() - f.started)
+                        if not d or found >= limit:
+                            account(f, "wasted")
+                            # the fetch its mirrors were waiting on failed; try
+                            # them instead, otherwise the next candidate
+                            candidates.extendleft(reversed(f.held))
+                            if found < k:
+                                launch(tg, max(1, len(f.held)))
+                            continue
+                        fp = d["fp"]
+                        rep = near(fp) if fp is not None else None
+                        fresh = rep is None
+                        if fresh:
+                            account(f, "used")
+                            handle = await put_doc(run_id, d["url"], d["title"], d["content"])
+                            handle["mirrors"] = []
+                            rep = [fp, f.rank, handle]
+                            kept.append(rep)
+                        else:
+                            account(f, "wasted")
+                            stats["duplicates"] += 1
+                            # a better-ranked duplicate becomes the source only with
+                            # keep_best, since that rewrites a handle already yielded
+                            if keep_best and f.rank < rep[1]:
+                                _promote(rep, f.rank, await put_doc(run_id, d["url"], d["title"], d["content"]))
+                            else:
+                                _merge(rep[2], d["url"])
+                            if found < k:
+                                launch(tg, 1)
+                        for r, u in f.held:
+                            stats["duplicates"] += 1
+                            _merge(rep[2], u)
+                        if fresh:
+                            found += 1
+                            # past max_sources, fetches already in flight may add docs
+                            # up to `limit` within _EXTRA_WAIT_S; nothing new is launched
+                            if found == k and limit > k:
+                                extra_until = loop.time() + _EXTRA_WAIT_S
+                                deadline = extra_until if deadline is None else min(deadline, extra_until)
+                            try:
+                                yield rep[2]
+                            except GeneratorExit:
+                                # leave the TaskGroup normally so it can reap the fetches
+                                closed = True
+                                break
+                    if closed:
+                        break
+
+                    # a fetch slower than the hedge threshold gets the next
+                    # candidate fetched alongside it
+                    now = loop.time()
+                    for f in list(inflight.values()):
+                        if candidates and found < k and not f.hedged and now - f.started >= hedge_after:
+                            f.hedged = True
+                            stats["hedged"] += 1
+                            record_fetch_hedged()
+                            launch(tg, 1)
+            finally:
+                # losers are cancelled here; the TaskGroup waits for them to finish
+                for task, f in inflight.items():
+                    if task.done():
+                        account(f, "wasted")
+                    else:
+                        task.cancel()
+                        cancelled.append(f)
+    finally:
+        for f in cancelled:
+            stats["cancelled"] += 1
+            record_fetch_cancelled()
+            account(f, "cancelled")
+
+async def retriever_node(state: GraphState) -> GraphState:
+    run_id = state.get("run_id", "unknown")
+    await bus.publish(make_event(run_id, "retrieve", "started", agent="retriever"))
+    clock = StageClock(state, "retrieve")
 
     docs: List[Dict] = []
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        tasks = [_fetch(u, client) for u in urls]
-        for coro in asyncio.as_completed(tasks):
-            d = await coro
-            if d:
-                docs.append(d)
-            if len(docs) >= k:
-                break
-
-    await bus.publish(make_event(run_id, "retrieve", "completed", agent="retriever", data={"docs": len(docs)}))
-    return {**state, "docs": docs}
+    stats: Dict = {}
+    k = int(state.get("max_sources", 6))
+    # fetch the whole window, then keep the k whose bodies match best
+    stream = iter_docs(state, clock.budget_s, stats, limit=state.get("fetch_window"), keep_best=True)
+    async with aclosing(stream):
+        async for d in stream:
+            docs.append(d)
+    stats["fetched"] = len(docs)
+    docs = (await asyncio.to_thread(rank_docs, state, docs))[:k]
+
+    await bus.publish(make_event(run_id, "retrieve", "completed", agent="retriever", duration_ms=clock.elapsed_ms,
+                                 data=clock.report({"docs": len(docs), **stats})))
+    return {"docs": docs}
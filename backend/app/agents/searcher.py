@@ -5,8 +5,10 @@ from typing import List, Dict, Optional
 from ..observability.events import bus, make_event
 from ..config import settings
 from ..graph.state import GraphState
+from ..graph.budget import StageClock, clamp_timeout
 from ..tools.search_providers import get_search_provider
 from ..tools.search_providers.duckduckgo import ddg_search
+from ..tools.search_providers.fusion import rrf_merge
 
 def _domain(u: str) -> str:
     host = (urlparse(u).hostname or "").lower()
@@ -24,21 +26,80 @@ def _looks_english(text: str, url: str) -> bool:
         return False
     return True
 
-async def _provider_search(query: str, k: int, domains: Optional[List[str]]) -> List[Dict]:
+async def _provider_search(query: str, k: int, domains: Optional[List[str]], timeout: float = 20) -> List[Dict]:
+    """
+    Primary provider, then DuckDuckGo if it fails. Both share one `timeout`:
+    the fallback only gets what the primary left over.
+    """
     search_fn = get_search_provider()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
     try:
-        res = await search_fn(query, max_results=k, domains=domains)
+        res = await asyncio.wait_for(search_fn(query, max_results=k, domains=domains, timeout=timeout), timeout)
         return [
             {"title": r.get("title", ""), "url": r.get("url", "") or r.get("link", ""), "snippet": r.get("snippet", "")}
             for r in res
         ]
     except Exception:
-        res = await ddg_search(query, max_results=k)
+        if (settings.SEARCH_PROVIDER or "").lower().strip() == "federated":
+            return []  # DuckDuckGo was already part of the federated call
+        left = deadline - loop.time()
+        if left <= 0:
+            return []
+        try:
+            res = await asyncio.wait_for(ddg_search(query, max_results=k, timeout=left), left)
+        except Exception:
+            return []
         return [
             {"title": r.get("title", ""), "url": r.get("url", "") or r.get("link", ""), "snippet": r.get("snippet", "")}
             for r in res
         ]
 
+_STOP = {
+    "a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "into", "from", "by", "about",
+    "identify", "collect", "extract", "synthesize", "clarify", "write", "scope", "sources", "source",
+    "high-quality", "quality", "key", "brief", "report", "citations", "evidence", "claims", "research",
+    "review", "compare", "analyze", "assess", "evaluate", "summarize", "define", "outline", "find",
+}
+
+def _sub_queries(topic: str, plan: List[str], limit: int) -> List[str]:
+    """
+    The topic itself plus one query per plan step: the topic extended with the
+    step's distinctive words (generic planning verbs and topic words removed).
+    """
+    topic_words = {w.lower() for w in re.findall(r"\w+", topic)}
+    queries = [topic]
+    for step in plan[: max(0, limit)]:
+        words = [
+            w for w in re.findall(r"[\w-]+", step)
+            if w.lower() not in _STOP and w.lower() not in topic_words and not w.isdigit()
+        ]
+        if not words:
+            continue
+        q = f"{topic} {' '.join(words[:6])}"
+        if q not in queries:
+            queries.append(q)
+    return queries
+
+async def _fan_out(queries: List[str], k: int, domains: Optional[List[str]], timeout: float) -> List[Dict]:
+    sem = asyncio.Semaphore(max(1, settings.SEARCH_FANOUT_CONCURRENCY))
+    # one deadline for the whole fan-out, including time spent queued on sem
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    async def _one(i: int, q: str) -> List[Dict]:
+        async with sem:
+            left = deadline - loop.time()
+            if left <= 0:
+                return []
+            # the raw topic gets the wider result window
+            return await _provider_search(q, max(10, k * 2) if i == 0 else max(5, k), domains, timeout=left)
+
+    lists = await asyncio.gather(*[_one(i, q) for i, q in enumerate(queries)])
+    # the topic query anchors the ranking; plan-step queries broaden it
+    weights = [1.5] + [1.0] * (len(lists) - 1)
+    return rrf_merge(lists, weights=weights)
+
 async def searcher_node(state: GraphState) -> GraphState:
     run_id = state.get("run_id", "unknown")
     q = state.get("topic", "")
@@ -46,8 +107,11 @@ async def searcher_node(state: GraphState) -> GraphState:
     domains = state.get("domains") or None
 
     await bus.publish(make_event(run_id, "search", "started", agent="searcher"))
+    clock = StageClock(state, "search")
 
-    raw = await _provider_search(q, max(10, k * 2), domains)  
+    fanout = int(state.get("limits", {}).get("search_fanout", 0))
+    queries = _sub_queries(q, state.get("plan") or [], fanout)
+    raw = await _fan_out(queries, k, domains, timeout=clamp_timeout(state, "search", 20))
 
     seen = set()
     dedup: List[Dict] = []
@@ -61,22 +125,25 @@ async def searcher_node(state: GraphState) -> GraphState:
         seen.add(d)
         dedup.append(item)
 
+    # a wider pool than max_sources; the ranker decides what gets fetched
+    pool = k * 3
     prefer_lang = (settings.PREFER_LANG or "").lower()
     out: List[Dict] = []
     if prefer_lang == "en":
         for item in dedup:
             if _looks_english(item.get("snippet", ""), item["url"]):
                 out.append(item)
-                if len(out) >= k:
+                if len(out) >= pool:
                     break
-        if len(out) < k:
+        if len(out) < pool:
             for item in dedup:
                 if item not in out:
                     out.append(item)
-                    if len(out) >= k:
+                    if len(out) >= pool:
                         break
     else:
-        out = dedup[:k]
+        out = dedup[:pool]
 
-    await bus.publish(make_event(run_id, "search", "completed", agent="searcher", data={"count": len(out)}))
-    return {**state, "results": out}
\ No newline at end of file
+    await bus.publish(make_event(run_id, "search", "completed", agent="searcher",
+                                 duration_ms=clock.elapsed_ms, data=clock.report({"count": len(out), "queries": len(queries)})))
+    return {"results": out}
\ No newline at end of file
@@ -0,0 +1,61 @@
+from __future__ import annotations
+import asyncio
+from contextlib import aclosing
+from typing import Dict, List, Optional
+from ..observability.events import bus, make_event
+from ..graph.state import GraphState
+from ..graph.budget import StageClock
+from .ranker import rank_docs
+from .retriever import iter_docs
+from .summarizer import summarize_doc, target_words
+
+async def retrieve_summarize_node(state: GraphState) -> GraphState:
+    """
+    Streaming replacement for retriever -> summarizer. Docs flow through a
+    queue as soon as they are fetched, so summarizing early docs overlaps with
+    fetching slow ones; docs and notes are put in relevance order at the end.
+    Emits the usual retrieve/summarize events plus one summarize "progress"
+    event per doc.
+    """
+    run_id = state.get("run_id", "unknown")
+    await bus.publish(make_event(run_id, "retrieve", "started", agent="retriever"))
+    await bus.publish(make_event(run_id, "summarize", "started", agent="summarizer"))
+    r_clock = StageClock(state, "retrieve")
+    s_clock = StageClock(state, "summarize")
+
+    words = target_words(state)
+    topic = state.get("topic", "")
+    queue: asyncio.Queue[Optional[Dict]] = asyncio.Queue()
+    docs: List[Dict] = []
+    notes: List[Dict] = []
+    stats: Dict = {}
+
+    async def produce() -> None:
+        try:
+            async with aclosing(iter_docs(state, r_clock.budget_s, stats)) as stream:
+                async for d in stream:
+                    docs.append(d)
+                    await queue.put(d)
+        finally:
+            await queue.put(None)
+        await bus.publish(make_event(run_id, "retrieve", "completed", agent="retriever", duration_ms=r_clock.elapsed_ms,
+                                     data=r_clock.report({"docs": len(docs), **stats})))
+
+    async def consume() -> None:
+        while (d := await queue.get()) is not None:
+            notes.append(await asyncio.to_thread(summarize_doc, run_id, d, words, topic))
+            await bus.publish(make_event(run_id, "summarize", "progress", agent="summarizer",
+                                         message="summarized", data={"url": d["url"], "index": len(notes)}))
+
+    await asyncio.gather(produce(), consume())
+    # notes were made in the same order as docs
+    note_of = {id(d): n for d, n in zip(docs, notes)}
+    # already summarized, so ranking only orders them
+    docs = await asyncio.to_thread(rank_docs, state, docs)
+    notes = [note_of[id(d)] for d in docs if id(d) in note_of]
+
+    await bus.publish(
+        make_event(run_id, "summarize", "completed", agent="summarizer", duration_ms=s_clock.elapsed_ms,
+                   data=s_clock.report({"notes": len(notes), "target_words": words}))
+    )
+    return {"docs": docs, "notes": notes}
@@ -1,32 +1,175 @@
 from __future__ import annotations
-import asyncio
+import asyncio, math, re
+from typing import Dict, List, Sequence
+import numpy as np
 from ..observability.events import bus, make_event
 from ..graph.state import GraphState
+from ..graph.budget import StageClock
+from ..storage.blobs import read_doc
+
+_MAX_BYTES = 100_000      # per doc body read for summarization
+_MAX_SENTENCES = 150      # candidate sentences per doc
+_DAMPING = 0.85
+_ITERATIONS = 30
+
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[\"'“(\[]?[A-Z0-9])")
+_WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+_STOP = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers him his how i if in into is it its itself just me more most my no nor not now
+of off on once only or other our out over own same she should so some such than that the their them
+then there these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your
+""".split())
 
 def _shorten(s: str, n: int = 500) -> str:
     s = " ".join(s.split())
     return s[: n - 3] + "..." if len(s) > n else s
 
+def target_words(state: GraphState) -> int:
+    return int(state.get("limits", {}).get("summary_words", 200))
+
+def _sentences(text: str) -> List[str]:
+    out = []
+    for s in _SENT_SPLIT.split(" ".join(text.split())):
+        n = s.count(" ") + 1
+        if 5 <= n <= 60:
+            out.append(s)
+        if len(out) >= _MAX_SENTENCES:
+            break
+    return out
+
+def _terms(s: str) -> List[str]:
+    return [w for w in _WORD.findall(s.lower()) if w not in _STOP and len(w) > 1]
+
+def extract_summaries(texts: Sequence[str], topic: str, budget_words: int) -> List[str]:
+    """
+    Extractive summaries for a batch of docs, each at most `budget_words`.
+    CPU-bound; callers run it off the event loop.
+    """
+    sents: List[str] = []
+    owner: List[int] = []
+    for i, text in enumerate(texts):
+        for s in _sentences(text):
+            sents.append(s)
+            owner.append(i)
+    # docs without usable sentences keep a plain truncation
+    out = [_shorten(t, max(80, budget_words * 6)) for t in texts]
+    if not sents:
+        return out
+
+    # IDF over the whole batch; for a single doc (the streaming pipeline) that
+    # only damps terms the page repeats everywhere
+    tokens = [_terms(s) for s in sents]
+    df: Dict[str, int] = {}
+    for toks in tokens:
+        for w in set(toks):
+            df[w] = df.get(w, 0) + 1
+    n = len(sents)
+    idf = {w: math.log((1 + n) / (1 + c)) + 1 for w, c in df.items()}
+    topic_terms = {t for t in _terms(topic) if t in idf}
+    q_norm = math.sqrt(sum(idf[t] ** 2 for t in topic_terms)) + 1e-9
+
+    owner_arr = np.asarray(owner)
+    counts = np.bincount(owner_arr, minlength=len(texts))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    m = int(counts.max())
+    sim = np.zeros((len(texts), m, m), dtype=np.float32)
+    topic_sim = np.zeros(n, dtype=np.float32)
+    for i, (a, c) in enumerate(zip(starts, counts)):
+        if not c:
+            continue
+        # (sentences x the doc's own terms) block: sentences are only compared
+        # within their doc
+        local: Dict[str, int] = {}
+        rows, cols = [], []
+        for r, toks in enumerate(tokens[a:a + c]):
+            for t in toks:
+                rows.append(r)
+                cols.append(local.setdefault(t, len(local)))
+        tf = np.zeros((c, max(1, len(local))), dtype=np.float32)
+        np.add.at(tf, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1.0)
+        weights = np.zeros(tf.shape[1], dtype=np.float32)
+        for t, j in local.items():
+            weights[j] = idf[t]
+        block = np.log1p(tf) * weights
+        block /= np.linalg.norm(block, axis=1, keepdims=True) + 1e-9
+        sim[i, :c, :c] = block @ block.T
+        q = np.zeros(tf.shape[1], dtype=np.float32)
+        for t in topic_terms:
+            if t in local:
+                q[local[t]] = idf[t]
+        topic_sim[a:a + c] = block @ q / q_norm
+
+    # TextRank for every doc at once: each doc's similarity block is padded
+    # into a (docs, m, m) stack and the power iteration runs on the stack
+    sim[:, np.arange(m), np.arange(m)] = 0.0
+    out_deg = sim.sum(axis=2, keepdims=True)
+    trans = np.divide(sim, out_deg, out=np.zeros_like(sim), where=out_deg > 0)
+    valid = np.arange(m)[None, :] < counts[:, None]
+    teleport = np.where(valid, (1 - _DAMPING) / np.maximum(counts, 1)[:, None], 0.0).astype(np.float32)
+    rank = valid / np.maximum(counts, 1)[:, None].astype(np.float32)
+    trans_t = trans.transpose(0, 2, 1)
+    for _ in range(_ITERATIONS):
+        rank = teleport + _DAMPING * np.matmul(trans_t, rank[:, :, None])[:, :, 0]
+    rank *= counts[:, None]  # mean 1 within each doc
+
+    lengths = [s.count(" ") + 1 for s in sents]
+    for i, (a, c) in enumerate(zip(starts, counts)):
+        if not c:
+            continue
+        # TextRank blended with topic similarity, picked greedily without
+        # near-repeats, then put back in page order
+        score = rank[i, :c] * (1.0 + 2.0 * topic_sim[a:a + c])
+        picked: List[int] = []
+        used = 0
+        for j in np.argsort(-score, kind="stable"):
+            if used + lengths[a + j] > budget_words:
+                continue
+            if picked and float(sim[i, j, picked].max()) > 0.7:
+                continue
+            picked.append(int(j))
+            used += lengths[a + j]
+        if picked:
+            out[i] = " ".join(sents[a + j] for j in sorted(picked))
+    return out
+
+def _note(d: Dict, summary: str) -> Dict:
+    return {
+        "url": d["url"],
+        "mirrors": d.get("mirrors", []),
+        "bullets": [
+            summary,
+            f"Title: {d.get('title','')}",
+        ],
+    }
+
+def _doc_budget(words: int) -> int:
+    # same per-source length the truncating summarizer produced
+    return max(25, int(words * 0.6))
+
+def summarize_doc(run_id: str, d: Dict, words: int, topic: str = "") -> Dict:
+    text = read_doc(run_id, d, limit=_MAX_BYTES)
+    return _note(d, extract_summaries([text], topic, _doc_budget(words))[0])
+
+def _summarize_all(run_id: str, docs: List[Dict], words: int, topic: str) -> List[Dict]:
+    texts = [read_doc(run_id, d, limit=_MAX_BYTES) for d in docs]
+    summaries = extract_summaries(texts, topic, _doc_budget(words))
+    return [_note(d, s) for d, s in zip(docs, summaries)]
+
 async def summarizer_node(state: GraphState) -> GraphState:
     run_id = state.get("run_id", "unknown")
     await bus.publish(make_event(run_id, "summarize", "started", agent="summarizer"))
+    clock = StageClock(state, "summarize")
 
-    limits = state.get("limits", {})
-    target_words = int(limits.get("summary_words", 200))
-    bullet_chars = max(80, int(target_words * 6 * 0.6))
-
+    words = target_words(state)
     k = int(state.get("max_sources", 6))
-    notes = []
-    for d in state.get("docs", [])[: max(1, k)]:
-        notes.append({
-            "url": d["url"],
-            "bullets": [
-                _shorten(d.get("content", ""), bullet_chars),
-                f"Title: {d.get('title','')}",
-            ],
-        })
+    docs = state.get("docs", [])[: max(1, k)]
+    notes = await asyncio.to_thread(_summarize_all, run_id, docs, words, state.get("topic", ""))
 
     await bus.publish(
-        make_event(run_id, "summarize", "completed", agent="summarizer", data={"notes": len(notes), "target_words": target_words})
+        make_event(run_id, "summarize", "completed", agent="summarizer", duration_ms=clock.elapsed_ms,
+                   data=clock.report({"notes": len(notes), "target_words": words}))
     )
-    return {**state, "notes": notes}
+    return {"notes": notes}
@@ -2,6 +2,7 @@ from __future__ import annotations
 from ..observability.events import bus, make_event
 from ..config import settings
 from ..graph.state import GraphState
+from ..graph.budget import StageClock
 from typing import List, Dict
 
 def _mk_report(topic: str, notes: List[Dict], model: str, provider: str) -> str:
@@ -32,7 +33,8 @@ def _mk_report(topic: str, notes: List[Dict], model: str, provider: str) -> str:
         for n in notes:
             url = n.get("url") or ""
             if url:
-                lines.append(f"- {url}")
+                mirrors = [m for m in n.get("mirrors", []) if m != url]
+                lines.append(f"- {url}" + (f" (also: {', '.join(mirrors)})" if mirrors else ""))
     lines.append("")
     lines.append(f"_Model: {model} · Search: {provider}_")
     return "\n".join(lines)
@@ -40,6 +42,7 @@ def _mk_report(topic: str, notes: List[Dict], model: str, provider: str) -> str:
 async def synthesizer_node(state: GraphState) -> GraphState:
     run_id = state.get("run_id", "unknown")
     await bus.publish(make_event(run_id, "synthesize", "started", agent="synthesizer"))
+    clock = StageClock(state, "synthesize")
 
     topic = state.get("topic", "")
     notes = state.get("notes", [])
@@ -48,5 +51,6 @@ async def synthesizer_node(state: GraphState) -> GraphState:
 
     report_md = _mk_report(topic, notes, model, provider)
 
-    await bus.publish(make_event(run_id, "synthesize", "completed", agent="synthesizer"))
-    return {**state,"report_md": report_md}
\ No newline at end of file
+    await bus.publish(make_event(run_id, "synthesize", "completed", agent="synthesizer",
+                                 duration_ms=clock.elapsed_ms, data=clock.report()))
+    return {"report_md": report_md}
\ No newline at end of file
@@ -13,13 +13,31 @@ class Settings(BaseSettings):
 
     GROQ_API_KEY: Optional[str] = None
     GROQ_MODEL: str = "llama-3.1-8b-instant"
+    GROQ_MAX_CONCURRENCY: int = 8
+    GROQ_TIMEOUT: float = 30.0
+    GROQ_RPM: int = 30
+    GROQ_TPM: int = 6000
+    GROQ_MAX_RETRIES: int = 3
+    # seconds a queued call waits to climb one priority class (stops starvation)
+    GROQ_PRIORITY_AGING_S: float = 30.0
+
+    # exact-match LLM response cache; TTL 0 disables it
+    LLM_CACHE_TTL: int = 7 * 86400
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.3
+    LLM_CACHE_MAX_ENTRIES: int = 256
+    LLM_CACHE_SQLITE: bool = True
 
     SEARCH_PROVIDER: str = "tavily"
     TAVILY_API_KEY: Optional[str] = None
     SERPAPI_API_KEY: Optional[str] = None
+    # SEARCH_PROVIDER="federated" queries Tavily, SerpAPI (when keyed) and DuckDuckGo
+    # at once and fuses the rankings; mode "first_k" returns as soon as enough
+    # unique results are in and cancels the slower providers
+    SEARCH_FEDERATED_MODE: str = "all"
     PREFER_LANG: str = "en"
     N8N_WEBHOOK_URL: Optional[str] = None
     N8N_SECRET: Optional[str] = None
+    N8N_TIMEOUT: float = 20.0
 
     CORS_ORIGINS: List[str] = Field(
         default_factory=lambda: ["http://localhost:3000", "http://127.0.0.1:3000"]
@@ -27,4 +45,74 @@ class Settings(BaseSettings):
 
     SIM_DELAY_MS: int = 600
 
+    # overlap retrieval and summarization in one streaming graph node
+    STREAMING_PIPELINE: bool = False
+
+    # shared outbound HTTP pool
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 40
+    HTTP_MAX_PER_HOST: int = 8
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 20.0
+    HTTP2: bool = False
+
+    # polite page fetching: per-host slots and spacing, robots.txt, and a global
+    # concurrency limit that adapts (AIMD) to errors and slow responses
+    FETCH_PER_HOST: int = 2
+    FETCH_HOST_INTERVAL_S: float = 0.5
+    FETCH_CONCURRENCY_MIN: int = 4
+    FETCH_CONCURRENCY_MAX: int = 64
+    FETCH_LATENCY_TARGET_S: float = 5.0
+    ROBOTS_ENABLED: bool = True
+    ROBOTS_USER_AGENT: str = "HSCL-Capstone"
+    ROBOTS_TTL: int = 86400
+
+    # HTML extraction pool: "process" or "thread"; 0 workers = min(8, cpu count)
+    EXTRACT_EXECUTOR: str = "process"
+    EXTRACT_WORKERS: int = 0
+
+    # on-disk page cache (TTL comes from the depth preset)
+    PAGE_CACHE_ENABLED: bool = True
+    PAGE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # search result cache; TTL 0 disables it
+    SEARCH_CACHE_TTL: int = 3600
+    SEARCH_CACHE_MAX_ENTRIES: int = 512
+    SEARCH_CACHE_SQLITE: bool = True
+    SEARCH_FANOUT_CONCURRENCY: int = 4
+
+    # near-duplicate collapsing in the retriever (64-bit SimHash)
+    DEDUP_ENABLED: bool = True
+    SIMHASH_MAX_DISTANCE: int = 3
+    FINGERPRINT_TTL: int = 30 * 86400
+
+    # hedged fetches: once a fetch is slower than this percentile of recent
+    # fetch latencies, the next candidate is fetched alongside it
+    HEDGE_ENABLED: bool = True
+    HEDGE_PERCENTILE: float = 0.9
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_MIN_DELAY_S: float = 1.0
+
+    # run admission: concurrent runs and pending runs before POST /research returns 429
+    RUN_WORKERS: int = 4
+    RUN_QUEUE_MAX: int = 32
+
+    # shared run state for multi-worker deployments: "sqlite" (cross-process) or "memory"
+    RUN_STORE_BACKEND: str = "sqlite"
+    EVENT_BUS_BACKEND: str = "sqlite"
+    RUN_CACHE_MAX_ENTRIES: int = 1024
+    EVENT_BUS_POLL_S: float = 0.1
+    EVENT_LOG_RETENTION_S: int = 3600
+
+    # per-subscriber event buffer; overflow policy "coalesce" or "drop_oldest"
+    EVENT_QUEUE_MAX: int = 512
+    EVENT_OVERFLOW_POLICY: str = "coalesce"
+    # replay buffer: events kept per run, and how many runs are kept
+    EVENT_HISTORY_MAX: int = 1000
+    EVENT_HISTORY_RUNS: int = 256
+
+    # precompressed artifact variants, in server preference order ("zstd" needs zstandard)
+    ARTIFACT_ENCODINGS: List[str] = ["zstd", "gzip"]
+    ARTIFACT_COMPRESS_MIN_BYTES: int = 1024
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,67 @@
+from __future__ import annotations
+import math, time
+from typing import Any, Dict, Optional
+from .state import GraphState
+
+# Relative share of the run SLA each stage may use. Time left over by fast
+# stages is redistributed to the ones that follow.
+STAGE_SHARES: Dict[str, float] = {
+    "plan": 0.10,
+    "search": 0.15,
+    "rank": 0.02,
+    "retrieve": 0.33,
+    "summarize": 0.05,
+    "synthesize": 0.05,
+    "critique": 0.15,
+    "present": 0.15,
+}
+_ORDER = list(STAGE_SHARES)
+
+def remaining(state: GraphState) -> float:
+    """
+    Seconds left before the run deadline; inf when the run has none.
+    """
+    deadline = state.get("deadline")
+    if not deadline:
+        return math.inf
+    return max(0.0, deadline - time.time())
+
+def stage_budget(state: GraphState, step: str) -> float:
+    """
+    This stage's slice of the remaining time, proportional to its share among
+    the stages still to run.
+    """
+    left = remaining(state)
+    if math.isinf(left) or step not in STAGE_SHARES:
+        return left
+    later = sum(STAGE_SHARES[s] for s in _ORDER[_ORDER.index(step):])
+    return left * STAGE_SHARES[step] / later
+
+def clamp_timeout(state: GraphState, step: str, default: float, floor: float = 1.0) -> float:
+    """
+    A per-call timeout no longer than the stage budget (but at least `floor`).
+    """
+    return max(floor, min(default, stage_budget(state, step)))
+
+class StageClock:
+    """
+    Measures one stage against its budget for the `completed` event.
+    """
+
+    def __init__(self, state: GraphState, step: str) -> None:
+        self.budget_s = stage_budget(state, step)
+        self._t0 = time.perf_counter()
+
+    @property
+    def elapsed_ms(self) -> int:
+        return int((time.perf_counter() - self._t0) * 1000)
+
+    def report(self, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        out = dict(data or {})
+        if not math.isinf(self.budget_s):
+            budget_ms = int(self.budget_s * 1000)
+            out["budget_ms"] = budget_ms
+            over = self.elapsed_ms - budget_ms
+            if over > 0:
+                out["over_budget_ms"] = over
+        return out
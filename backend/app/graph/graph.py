@@ -4,32 +4,43 @@ from typing import Any
 
 from ..agents.planner import planner_node
 from ..agents.searcher import searcher_node
+from ..agents.ranker import ranker_node
 from ..agents.retriever import retriever_node
 from ..agents.summarizer import summarizer_node
 from ..agents.synthesizer import synthesizer_node
 from ..agents.critic import critic_node
 from ..agents.presenter import presenter_node
+from ..agents.streaming import retrieve_summarize_node
+from ..config import settings
+from .state import GraphState
 
 def build_research_graph():
     def merge_state(left: dict, right: dict) -> dict:
         """Merge right into left, preserving all keys"""
         return {**left, **right}
     
-    g = StateGraph(dict)
+    g = StateGraph(GraphState)
     
     g.add_node("planner", planner_node)
     g.add_node("searcher", searcher_node)
-    g.add_node("retriever", retriever_node)
-    g.add_node("summarizer", summarizer_node)
+    g.add_node("ranker", ranker_node)
     g.add_node("synthesizer", synthesizer_node)
     g.add_node("critic", critic_node)
     g.add_node("presenter", presenter_node)
 
     g.add_edge(START, "planner")
     g.add_edge("planner", "searcher")
-    g.add_edge("searcher", "retriever")
-    g.add_edge("retriever", "summarizer")
-    g.add_edge("summarizer", "synthesizer")
+    g.add_edge("searcher", "ranker")
+    if settings.STREAMING_PIPELINE:
+        g.add_node("retrieve_summarize", retrieve_summarize_node)
+        g.add_edge("ranker", "retrieve_summarize")
+        g.add_edge("retrieve_summarize", "synthesizer")
+    else:
+        g.add_node("retriever", retriever_node)
+        g.add_node("summarizer", summarizer_node)
+        g.add_edge("ranker", "retriever")
+        g.add_edge("retriever", "summarizer")
+        g.add_edge("summarizer", "synthesizer")
     g.add_edge("synthesizer", "critic")
     g.add_edge("critic", "presenter")
     g.add_edge("presenter", END)
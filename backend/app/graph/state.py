@@ -1,14 +1,36 @@
 from __future__ import annotations
-from typing import Annotated, Optional, Dict, Any
+from typing import Annotated, Optional, Dict, Any, List, TypedDict
 from langgraph.graph import add_messages
 from operator import add
+import time
 
-GraphState = dict[str, Any]
+class GraphState(TypedDict, total=False):
+    """
+    Run state. Each key is its own channel, so nodes return only the keys they
+    change. Docs are handles ({url, title, hash, length}); bodies live in the
+    run's blob store (storage/blobs.py).
+    """
+    run_id: str
+    topic: str
+    depth: str
+    domains: List[str]
+    max_sources: int
+    limits: Dict[str, Any]
+    sla_s: float
+    deadline: float
+    plan: List[str]
+    results: List[Dict[str, Any]]
+    fetch_window: int
+    docs: List[Dict[str, Any]]
+    notes: List[Dict[str, Any]]
+    report_md: str
+    critique: Any
+    artifacts: Dict[str, Any]
 
 DEPTH_PRESETS: Dict[str, Dict[str, Any]] = {
-    "quick":    {"max_sources": 3,  "fetch_timeout": 8,  "summary_words": 120},
-    "standard": {"max_sources": 6,  "fetch_timeout": 12, "summary_words": 200},
-    "deep":     {"max_sources": 10, "fetch_timeout": 18, "summary_words": 350},
+    "quick":    {"max_sources": 3,  "fetch_timeout": 8,  "summary_words": 120, "cache_ttl": 86400, "priority": 0, "sla_s": 45,  "search_fanout": 2, "html_bytes": 512 * 1024, "max_bytes": 4 * 1024 * 1024},
+    "standard": {"max_sources": 6,  "fetch_timeout": 12, "summary_words": 200, "cache_ttl": 43200, "priority": 1, "sla_s": 90,  "search_fanout": 4, "html_bytes": 1024 * 1024, "max_bytes": 8 * 1024 * 1024},
+    "deep":     {"max_sources": 10, "fetch_timeout": 18, "summary_words": 350, "cache_ttl": 21600, "priority": 2, "sla_s": 180, "search_fanout": 6, "html_bytes": 2048 * 1024, "max_bytes": 16 * 1024 * 1024},
 }
 
 def make_initial_state(
@@ -17,12 +39,15 @@ def make_initial_state(
     depth: str = "standard",
     domains: Optional[list[str]] = None,
     max_sources: Optional[int] = None,
+    sla_s: Optional[float] = None,
 ) -> GraphState:
     """
     Build the initial state and inject depth-based limits. Caller max_sources overrides preset.
+    The run deadline is now + sla_s (caller value, else the preset's SLA).
     """
     preset = DEPTH_PRESETS.get(depth, DEPTH_PRESETS["standard"])
     eff_max_sources = max_sources or preset["max_sources"]
+    eff_sla = float(sla_s or preset["sla_s"])
 
     return {
         "run_id": run_id,
@@ -31,6 +56,8 @@ def make_initial_state(
         "domains": domains or [],
         "max_sources": eff_max_sources,
         "limits": preset,
+        "sla_s": eff_sla,
+        "deadline": time.time() + eff_sla,
         "results": [],
         "docs": [],
         "notes": [],
@@ -1,17 +1,17 @@
 from __future__ import annotations
 import asyncio, hmac, hashlib, json
 from typing import Any, Dict, Tuple, Optional
-import httpx
 from ..config import settings
+from ..tools.http_client import http_pool
 from ..observability.metrics import record_webhook_error, record_webhook_request
 
 def _sign(body: bytes, secret: str) -> str:
     return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
 
-async def notify_n8n(payload: Dict[str, Any]) -> Optional[Tuple[int, str]]:
+async def notify_n8n(payload: Dict[str, Any], timeout: Optional[float] = None) -> Optional[Tuple[int, str]]:
     """
     Returns (status_code, text) or None if N8N_WEBHOOK_URL not set.
-    status=0 means connection exception.
+    status=0 means connection exception. timeout defaults to N8N_TIMEOUT.
     """
     url = (settings.N8N_WEBHOOK_URL or "").strip()
     if not url:
@@ -24,12 +24,15 @@ async def notify_n8n(payload: Dict[str, Any]) -> Optional[Tuple[int, str]]:
 
     record_webhook_request("n8n")
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        try:
-            r = await client.post(url, content=body, headers=headers, follow_redirects=True)
-            if not (200 <= r.status_code < 300):
-                record_webhook_error("n8n")
-            return r.status_code, r.text
-        except Exception as e:
+    client = await http_pool.get_client()
+    try:
+        r = await client.post(
+            url, content=body, headers=headers, follow_redirects=True,
+            timeout=timeout or settings.N8N_TIMEOUT,
+        )
+        if not (200 <= r.status_code < 300):
             record_webhook_error("n8n")
-            return 0, repr(e)
+        return r.status_code, r.text
+    except Exception as e:
+        record_webhook_error("n8n")
+        return 0, repr(e)
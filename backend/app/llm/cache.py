@@ -0,0 +1,43 @@
+from __future__ import annotations
+import hashlib, json
+from typing import List, Optional, Tuple
+from ..config import settings
+from ..storage.tiered_cache import TieredCache
+
+def cache_key(model: str, messages: List[dict], temperature: float, max_tokens: int) -> str:
+    raw = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def cacheable(temperature: float) -> bool:
+    """
+    Only near-deterministic calls are served from cache.
+    """
+    return settings.LLM_CACHE_TTL > 0 and temperature < settings.LLM_CACHE_MAX_TEMPERATURE
+
+class ResponseCache:
+    """
+    Exact-match cache of chat completions, stored as (text, prompt_tokens,
+    completion_tokens) in an LRU memory tier over a persistent SQLite tier.
+    """
+
+    def __init__(self, filename: str = "llm.db") -> None:
+        self._store = TieredCache(
+            filename,
+            "llm_responses",
+            ttl=lambda: settings.LLM_CACHE_TTL,
+            max_entries=lambda: settings.LLM_CACHE_MAX_ENTRIES,
+            persistent=lambda: settings.LLM_CACHE_SQLITE,
+        )
+
+    async def get(self, key: str) -> Optional[Tuple[str, int, int]]:
+        hit = await self._store.aget(key)
+        return tuple(hit) if hit else None
+
+    async def put(self, key: str, text: str, prompt_tokens: int, completion_tokens: int) -> None:
+        if text:
+            await self._store.aput(key, [text, prompt_tokens, completion_tokens])
+
+response_cache = ResponseCache()
@@ -1,40 +1,149 @@
 from __future__ import annotations
-import asyncio
-from typing import List, Tuple
-from groq import Groq
+import asyncio, time
+from typing import AsyncIterator, List, Tuple
+from groq import AsyncGroq
 from ..config import settings
+from ..observability.metrics import observe_groq_latency, observe_groq_ttft, record_groq_cached, record_groq_usage
+from .cache import cache_key, cacheable, response_cache
+from .scheduler import estimate_tokens, scheduler
 
-_client: Groq | None = None
+_client: AsyncGroq | None = None
+_limiter: asyncio.Semaphore | None = None
 
-def _get_client() -> Groq:
+def _get_client() -> AsyncGroq:
     global _client
     if _client is None:
-        _client = Groq(api_key=settings.GROQ_API_KEY)
+        # retries are owned by the scheduler so 429s respect the shared budget
+        _client = AsyncGroq(api_key=settings.GROQ_API_KEY, timeout=settings.GROQ_TIMEOUT, max_retries=0)
     return _client
 
+def _get_limiter() -> asyncio.Semaphore:
+    """
+    Process-wide cap on in-flight Groq calls, shared by every agent and run.
+    """
+    global _limiter
+    if _limiter is None:
+        _limiter = asyncio.Semaphore(max(1, settings.GROQ_MAX_CONCURRENCY))
+    return _limiter
+
 async def chat(
     messages: List[dict],
     *,
     model: str | None = None,
     temperature: float = 0.2,
     max_tokens: int = 900,
+    agent: str = "llm",
+    priority: int = 1,
+    timeout: float | None = None,
 ) -> Tuple[str, int, int]:
     """
-    Returns (text, prompt_tokens, completion_tokens)
+    Returns (text, prompt_tokens, completion_tokens) and records usage under
+    `agent`. Low-temperature calls are served from the response cache, in which
+    case both token counts are 0. Lower priority values are dispatched first
+    when the rate budget is exhausted. `timeout` bounds queueing plus the call.
     """
     client = _get_client()
+    model = model or settings.GROQ_MODEL
+
+    key = cache_key(model, messages, temperature, max_tokens) if cacheable(temperature) else None
+    if key:
+        hit = await response_cache.get(key)
+        if hit:
+            text, pt, ct = hit
+            record_groq_cached(model, agent, pt + ct)
+            return text, 0, 0
+
+    estimated = estimate_tokens(messages, max_tokens)
 
-    def _call():
-        return client.chat.completions.create(
-            model=model or settings.GROQ_MODEL,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+    async def _call():
+        async with _get_limiter():
+            t0 = time.perf_counter()
+            resp = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout or settings.GROQ_TIMEOUT,
+            )
+            observe_groq_latency(model, agent, time.perf_counter() - t0)
+            return resp
+
+    resp = await asyncio.wait_for(
+        scheduler.run(_call, tokens=estimated, priority=priority, model=model, agent=agent),
+        timeout,
+    )
 
-    resp = await asyncio.to_thread(_call)
     text = resp.choices[0].message.content or ""
     usage = getattr(resp, "usage", None)
     prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
     completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    if usage is not None:
+        scheduler.settle(estimated, prompt_tokens + completion_tokens)
+    record_groq_usage(model, agent, prompt_tokens, completion_tokens)
+    if key:
+        await response_cache.put(key, text, prompt_tokens, completion_tokens)
     return text, prompt_tokens, completion_tokens
+
+async def chat_stream(
+    messages: List[dict],
+    *,
+    model: str | None = None,
+    temperature: float = 0.2,
+    max_tokens: int = 900,
+    agent: str = "llm",
+    priority: int = 1,
+    timeout: float | None = None,
+) -> AsyncIterator[str]:
+    """
+    Yields content tokens as they arrive. Token usage is recorded here since a
+    generator cannot hand it back to the caller.
+    """
+    client = _get_client()
+    model = model or settings.GROQ_MODEL
+    estimated = estimate_tokens(messages, max_tokens)
+    limiter = _get_limiter()
+
+    async def _open():
+        await limiter.acquire()
+        try:
+            return await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                timeout=timeout or settings.GROQ_TIMEOUT,
+            )
+        except BaseException:
+            limiter.release()
+            raise
+
+    t0 = time.perf_counter()
+    stream = await asyncio.wait_for(
+        scheduler.run(_open, tokens=estimated, priority=priority, model=model, agent=agent),
+        timeout,
+    )
+    try:
+        first = True
+        usage = None
+        try:
+            async for chunk in stream:
+                usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if first:
+                    observe_groq_ttft(model, agent, time.perf_counter() - t0)
+                    first = False
+                yield delta
+        finally:
+            await stream.close()
+            observe_groq_latency(model, agent, time.perf_counter() - t0)
+    finally:
+        limiter.release()
+
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    if usage is not None:
+        scheduler.settle(estimated, prompt_tokens + completion_tokens)
+    record_groq_usage(model, agent, prompt_tokens, completion_tokens)
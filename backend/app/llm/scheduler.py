@@ -0,0 +1,159 @@
+from __future__ import annotations
+import asyncio, heapq, itertools, random, time
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+from groq import RateLimitError
+from ..config import settings
+from ..observability.metrics import bind_groq_queue_depth, observe_groq_throttle, record_groq_rate_limited
+
+T = TypeVar("T")
+
+def estimate_tokens(messages: List[dict], max_tokens: int) -> int:
+    """
+    Cheap pre-dispatch estimate (~4 chars per token plus per-message overhead).
+    Completion is budgeted at max_tokens and refunded once usage is known.
+    """
+    chars = sum(len(str(m.get("content") or "")) for m in messages)
+    return chars // 4 + 4 * len(messages) + max_tokens
+
+def _retry_after(err: RateLimitError) -> Optional[float]:
+    headers = getattr(getattr(err, "response", None), "headers", None) or {}
+    raw = headers.get("retry-after")
+    try:
+        return float(raw) if raw is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(max(1, per_minute))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self._last = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        need = min(amount, self.capacity) - self.tokens
+        return 0.0 if need <= 0 else need / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class GroqScheduler:
+    """
+    Central admission for Groq calls. Holds requests-per-minute and
+    tokens-per-minute budgets, releases queued calls by priority (lower value
+    first, FIFO within a class) and pauses everyone after a 429 for the
+    server's retry-after plus jitter, instead of failing the stage. Waiting
+    calls age: every GROQ_PRIORITY_AGING_S queued counts as one class better,
+    so deep runs are not starved by a steady stream of quick ones.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._rpm: Optional[TokenBucket] = None
+        self._tpm: Optional[TokenBucket] = None
+        self._paused_until = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._pump: Optional[asyncio.Task] = None
+        bind_groq_queue_depth(lambda: len(self._heap))
+
+    def _buckets(self) -> Tuple[TokenBucket, TokenBucket]:
+        if self._rpm is None:
+            self._rpm = TokenBucket(settings.GROQ_RPM)
+            self._tpm = TokenBucket(settings.GROQ_TPM)
+        return self._rpm, self._tpm
+
+    async def _run_pump(self) -> None:
+        rpm, tpm = self._buckets()
+        while self._heap:
+            priority, _, tokens, fut = self._heap[0]
+            if fut.done():
+                heapq.heappop(self._heap)
+                continue
+            now = time.monotonic()
+            wait = max(rpm.wait_time(1, now), tpm.wait_time(tokens, now), self._paused_until - now)
+            if wait > 0:
+                self._wakeup.clear()
+                try:
+                    # wake early if a higher-priority call arrives
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            rpm.take(1)
+            tpm.take(tokens)
+            fut.set_result(None)
+
+    async def acquire(self, tokens: int, priority: int = 1) -> None:
+        loop = asyncio.get_running_loop()
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        fut: asyncio.Future = loop.create_future()
+        # priority - waited / aging, ordered by the time-invariant part so
+        # the heap stays valid as everyone ages at the same rate
+        rank = priority + time.monotonic() / max(1e-3, settings.GROQ_PRIORITY_AGING_S)
+        heapq.heappush(self._heap, (rank, next(self._seq), tokens, fut))
+        self._wakeup.set()
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._run_pump())
+        try:
+            await fut
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """
+        Correct the TPM budget once real usage is known.
+        """
+        _, tpm = self._buckets()
+        if actual < estimated:
+            tpm.refund(estimated - actual)
+        elif actual > estimated:
+            tpm.take(actual - estimated)
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        *,
+        tokens: int,
+        priority: int = 1,
+        model: str = "",
+        agent: str = "llm",
+    ) -> T:
+        """
+        Admit, dispatch and retry `call` on 429 with retry-after aware, jittered
+        exponential backoff. Re-raises after GROQ_MAX_RETRIES attempts.
+        """
+        attempt = 0
+        while True:
+            t0 = time.monotonic()
+            await self.acquire(tokens, priority)
+            observe_groq_throttle(agent, time.monotonic() - t0)
+            try:
+                return await call()
+            except RateLimitError as e:
+                record_groq_rate_limited(model, agent)
+                # a rejected attempt used no tokens; the retry is charged again
+                self._buckets()[1].refund(tokens)
+                if attempt >= settings.GROQ_MAX_RETRIES:
+                    raise
+                base = _retry_after(e) or min(30.0, 1.0 * (2 ** attempt))
+                self.pause(base + random.uniform(0, base * 0.25))
+                attempt += 1
+
+scheduler = GroqScheduler()
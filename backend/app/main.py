@@ -1,32 +1,59 @@
-from fastapi import BackgroundTasks, FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import Dict, List, Optional
+from fastapi import FastAPI, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
 from .observability.metrics import init_metrics
 from .observability.logger import setup_json_logging
 from .observability.events import bus, sse_endpoint, make_event
-from .models import RunCreated, RunRequest
+from .models import RunCreated, RunEvent, RunRequest, RunStatus
+from .scheduler import QueueFull, scheduler
 from .storage.runs import store
 from .graph.state import make_initial_state
 from .graph.graph import build_research_graph
-from .storage.files import read_text
 from .integration.n8n import notify_n8n
+from .tools.http_client import http_pool
+from .tools.extraction import extractor
 from datetime import datetime
 from fastapi import HTTPException
-from fastapi.responses import FileResponse, PlainTextResponse
-from .storage.files import ARTIFACTS_DIR, read_text
+from fastapi.responses import FileResponse
+from .storage.artifacts import blob_path, manifest_entry, read_artifact
+from .storage.blobs import drop_docs
+from .storage.files import ARTIFACTS_DIR
 import logging
 import traceback
+import uuid
 
 setup_json_logging()
 
 VERSION = "0.1.0"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_pool.start()
+    extractor.start()
+    await scheduler.start()
+    await bus.start()  # tail other workers' events even with no local subscribers
+    try:
+        yield
+    finally:
+        # queued runs never started; the store is durable, so don't leave them pending
+        for run_id in await scheduler.stop():
+            store.error(run_id, "cancelled: server shut down before the run started")
+        await bus.close()
+        extractor.close()
+        await http_pool.close()
+
+
 app = FastAPI(
     title="HSCL Capstone Research Orchestrator",
     version=VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -35,6 +62,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After"],
 )
 
 init_metrics(app)
@@ -59,12 +87,14 @@ def root():
 
 
 @app.get("/events")
-async def events(request: Request, run_id: str | None = None):
+async def events(request: Request, run_id: str | None = None, last_event_id: str | None = None):
     """
     Server-Sent Events stream. Keep this tab open to watch runs in real-time.
-    Optional ?run_id=<uuid> to filter a specific run.
+    Optional ?run_id=<uuid> to filter a specific run; earlier events of that
+    run are replayed first, resuming after the Last-Event-ID header if sent.
     """
-    return await sse_endpoint(request, run_id=run_id)
+    last_event_id = request.headers.get("last-event-id") or last_event_id
+    return await sse_endpoint(request, run_id=run_id, last_event_id=last_event_id)
 
 
 async def _run_graph_async(run_id: str, req: RunRequest):
@@ -77,47 +107,110 @@ async def _run_graph_async(run_id: str, req: RunRequest):
             depth=req.depth,
             domains=req.domains,
             max_sources=req.max_sources,
+            sla_s=req.sla_seconds,
         )
 
         await _GRAPH.ainvoke(init_state)
 
         store.finish(run_id)
         await bus.publish(make_event(run_id, "run", "completed", message="Run finished"))
+    except asyncio.CancelledError:
+        # shutdown cancels running jobs; record that instead of leaving the run "running"
+        store.error(run_id, "cancelled")
+        with suppress(Exception):
+            await bus.publish(make_event(run_id, "run", "error", message="cancelled"))
+        raise
     except Exception as e:
         logging.exception("Run crashed (run_id=%s)", run_id)
         store.error(run_id, repr(e))
         await bus.publish(make_event(run_id, "run", "error", message=repr(e)))
+    finally:
+        # fetched bodies are only needed while the graph runs
+        await asyncio.to_thread(drop_docs, run_id)
+
+
+def _client_key(request: Request) -> str:
+    return request.headers.get("x-client-id") or (request.client.host if request.client else "anonymous")
+
+
+def _with_position(rs: RunStatus) -> RunStatus:
+    if rs.status != "pending":
+        return rs
+    return rs.model_copy(update={"queue_position": scheduler.position(rs.run_id)})
 
 
 @app.post("/research", response_model=RunCreated)
-async def research(req: RunRequest, background: BackgroundTasks):
+async def research(req: RunRequest, request: Request):
     """
     Start a research run. Returns {"run_id": "..."} immediately.
     Subscribe to /events (or /events?run_id=...) to watch progress.
+    Returns 429 with Retry-After when the run queue is full.
     """
-    rs = store.create(topic=req.topic, depth=req.depth)
-    background.add_task(_run_graph_async, rs.run_id, req)
-    return RunCreated(run_id=rs.run_id)
+    run_id = str(uuid.uuid4())
+    try:
+        await scheduler.submit(run_id, req.depth, _client_key(request), lambda: _run_graph_async(run_id, req))
+    except QueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail="run_queue_full",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    # no await since submit, so the row exists before a worker can start the run
+    store.create(topic=req.topic, depth=req.depth, run_id=run_id)
+    return RunCreated(run_id=run_id)
+
+
+@app.get("/runs/count")
+def count_runs(status: Optional[str] = None):
+    return {"count": store.count(status)}
 
 
+# scheduler state is only touched on the event loop, so endpoints that report
+# queue positions are async and do their store reads in a worker thread
+
 @app.get("/runs/{run_id}")
-def get_run(run_id: str):
-    rs = store.get(run_id)
+async def get_run(run_id: str):
+    rs = await asyncio.to_thread(store.get, run_id)
     if not rs:
         return {"error": "not_found"}
-    return rs
+    return _with_position(rs)
+
+@app.get("/runs/{run_id}/events", response_model=List[RunEvent])
+async def get_run_events(run_id: str, after: Optional[str] = None):
+    """
+    The run's event timeline, oldest first; `after` skips up to an event id.
+    """
+    return [e.to_dict() for e in await bus.history(run_id, after)]
 
 @app.get("/runs")
-def list_runs():
-    return store.list_all()
+async def list_runs(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    topic: Optional[str] = None,
+):
+    """
+    Newest runs first. When more remain, the X-Next-Cursor header carries the
+    cursor for the next page.
+    """
+    try:
+        runs, next_cursor = await asyncio.to_thread(
+            store.page, limit=limit, cursor=cursor, status=status, topic=topic
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid_cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [_with_position(rs) for rs in runs]
 
 @app.post("/runs/{run_id}/notify")
 async def resend_to_n8n(run_id: str):
-    rs = store.get(run_id)
+    rs = await asyncio.to_thread(store.get, run_id)
     if not rs:
         return {"ok": False, "error": "not_found"}
 
-    report_md = read_text(run_id, "report.md") or ""
+    report_md = await read_artifact(run_id, "report.md") or ""
     payload = {
         "run_id": run_id,
         "topic": rs.topic if hasattr(rs, 'topic') else "unknown",
@@ -134,15 +227,59 @@ async def resend_to_n8n(run_id: str):
     res = await notify_n8n(payload)
     return {"ok": res is not None, "result": res}
 
+def _pick_encoding(accept: str, available: List[str]) -> Optional[str]:
+    """
+    The acceptable encoding with the highest q-value (q=0 means "not this
+    one"); ties go to the order of `available`.
+    """
+    q: Dict[str, float] = {}
+    for part in accept.split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        weight = 1.0
+        for p in params:
+            if p.lower().startswith("q="):
+                try:
+                    weight = float(p[2:])
+                except ValueError:
+                    weight = 0.0
+        if name:
+            q[name.lower()] = weight
+    ranked = [(q.get(enc, q.get("*", 0.0)), -i, enc) for i, enc in enumerate(available)]
+    best = max(ranked, default=None)
+    return best[2] if best and best[0] > 0 else None
+
+
 @app.get("/runs/{run_id}/report")
-def get_report(run_id: str, inline: bool = False):
+def get_report(run_id: str, request: Request, inline: bool = False):
+    """
+    The run's Markdown report. Served with a content-hash ETag (If-None-Match
+    gets a 304), precompressed when the client accepts zstd or gzip, and with
+    byte Range support on the uncompressed representation.
+    """
     path = ARTIFACTS_DIR / run_id / "report.md"
     if not path.exists():
         raise HTTPException(status_code=404, detail="report_not_found")
-    if inline:
-        return PlainTextResponse(path.read_text(encoding="utf-8"))
-    return FileResponse(
-        path,
-        media_type="text/markdown",
-        filename=f"{run_id}-report.md",
-    )
+    media_type = "text/plain; charset=utf-8" if inline else "text/markdown"
+    disposition = {} if inline else {"filename": f"{run_id}-report.md"}
+
+    entry = manifest_entry(run_id, "report.md")
+    if entry is None:
+        # reports written before the manifest existed
+        return FileResponse(path, media_type=media_type, **disposition)
+
+    encodings = entry.get("encodings", [])
+    encoding = None
+    if "range" not in request.headers:
+        encoding = _pick_encoding(request.headers.get("accept-encoding", ""), encodings)
+    # one strong ETag per representation; any of them means the client is current
+    variants = {f'"{entry["hash"]}"'} | {f'"{entry["hash"]}-{enc}"' for enc in encodings}
+    etag = f'"{entry["hash"]}-{encoding}"' if encoding else f'"{entry["hash"]}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+
+    tags = {t.strip().removeprefix("W/") for t in request.headers.get("if-none-match", "").split(",")}
+    if tags & variants or "*" in tags:
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        path = blob_path(entry["hash"], encoding)
+    return FileResponse(path, media_type=media_type, headers=headers, **disposition)
@@ -8,6 +8,7 @@ class RunRequest(BaseModel):
     depth: str = Field("standard", description="standard | deep | quick")
     domains: Optional[List[str]] = Field(default=None)
     max_sources: int = Field(6, ge=1, le=20)
+    sla_seconds: Optional[float] = Field(None, ge=5, le=1800, description="Run deadline; defaults to the depth preset")
 
 class RunCreated(BaseModel):
     run_id: str
@@ -21,6 +22,7 @@ class RunStatus(BaseModel):
     error: Optional[str] = None
     topic: Optional[str] = None
     depth: Optional[str] = None
+    queue_position: Optional[int] = None
 
 
 class RunEvent(BaseModel):
@@ -42,4 +44,5 @@ class RunStatus(BaseModel):
     finished_at: Optional[datetime] = None
     error: Optional[str] = None
     topic: Optional[str] = None
-    depth: Optional[str] = None
\ No newline at end of file
+    depth: Optional[str] = None
+    queue_position: Optional[int] = None
\ No newline at end of file
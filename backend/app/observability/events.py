@@ -1,10 +1,20 @@
 from __future__ import annotations
-import asyncio, json, uuid
-from datetime import datetime
-from typing import AsyncIterator, Dict, Optional
+import asyncio, json, logging, os, threading, time, uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set, Tuple
 from fastapi import Request
 from starlette.responses import StreamingResponse
-from ..models import RunEvent
+from ..config import settings
+from ..storage.db import connect
+import orjson
+from .metrics import bind_event_max_lag, observe_event_lag, record_event_dropped, set_event_subscribers
+
+log = logging.getLogger(__name__)
+
+def _dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
 
 def _format_sse(data: str, event: Optional[str] = None, id: Optional[str] = None) -> str:
     lines = []
@@ -13,65 +23,419 @@ def _format_sse(data: str, event: Optional[str] = None, id: Optional[str] = None
     for chunk in data.splitlines():
         lines.append(f"data: {chunk}")
     lines.append("")
-    return "\n".join(lines)
+    return "\n".join(lines) + "\n"
+
+@dataclass(slots=True, eq=False)
+class Event:
+    """
+    A run event. Its JSON and SSE encodings are built once, on first use, and
+    shared by every subscriber. `event_id` is a per-run sequence number.
+    """
+    event_id: str
+    run_id: str
+    step: str
+    status: str
+    agent: Optional[str] = None
+    message: Optional[str] = None
+    ts: float = field(default_factory=time.time)
+    duration_ms: Optional[int] = None
+    data: Optional[Dict[str, Any]] = None
+    _payload: Optional[bytes] = field(default=None, repr=False)
+    _wire: Optional[bytes] = field(default=None, repr=False)
+
+    @property
+    def seq(self) -> int:
+        return int(self.event_id) if self.event_id.isdigit() else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "event_id": self.event_id,
+            "run_id": self.run_id,
+            "step": self.step,
+            "agent": self.agent,
+            "status": self.status,
+            "message": self.message,
+            "ts": datetime.fromtimestamp(self.ts, timezone.utc).replace(tzinfo=None).isoformat(),
+            "duration_ms": self.duration_ms,
+            "data": self.data,
+        }
+
+    @classmethod
+    def from_json(cls, payload: str | bytes) -> "Event":
+        raw = payload.encode("utf-8") if isinstance(payload, str) else payload
+        d = json.loads(raw)
+        ts = datetime.fromisoformat(d["ts"]).replace(tzinfo=timezone.utc).timestamp()
+        return cls(
+            event_id=d["event_id"], run_id=d["run_id"], step=d["step"], status=d["status"],
+            agent=d.get("agent"), message=d.get("message"), ts=ts,
+            duration_ms=d.get("duration_ms"), data=d.get("data"), _payload=raw,
+        )
+
+    @property
+    def payload(self) -> bytes:
+        if self._payload is None:
+            self._payload = _dumps(self.to_dict())
+        return self._payload
+
+    @property
+    def wire(self) -> bytes:
+        if self._wire is None:
+            head = b"event: run_event\n"
+            if self.event_id:
+                head += b"id: " + self.event_id.encode() + b"\n"
+            self._wire = head + b"data: " + self.payload + b"\n\n"
+        return self._wire
+
+WILDCARD = "*"
+
+class Subscription:
+    """
+    Bounded, queue-like buffer for one subscriber. When full, the overflow
+    policy decides what goes: "drop_oldest" discards the oldest event;
+    "coalesce" lets an incoming progress event replace the buffered progress
+    event of the same run and step (the newer one supersedes it), otherwise
+    discards the oldest progress event, falling back to the oldest event.
+    Discarded events (not superseded ones) are reported on the next reads as
+    one "gap" event per affected run carrying the number missed.
+    """
+
+    def __init__(self, run_id: Optional[str], maxsize: int, policy: str,
+                 on_remove: Optional[Callable[[float], None]] = None) -> None:
+        self.channel = run_id or WILDCARD
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._on_remove = on_remove  # called with the enqueue time of each event leaving the buffer
+        self._items: Deque[Tuple[float, Event]] = deque()
+        self._ready = asyncio.Event()
+        self._dropped: Dict[str, int] = {}  # run_id -> events missed
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items and not self._dropped
+
+    def head_at(self) -> float:
+        """Enqueue time of the oldest buffered event, 0.0 when there is none."""
+        return self._items[0][0] if self._items else 0.0
+
+    def _removed(self, queued_at: float) -> None:
+        if self._on_remove is not None:
+            self._on_remove(queued_at)
+
+    def put(self, event: Event) -> None:
+        if len(self._items) >= self.maxsize:
+            self._evict(event)
+        self._items.append((time.monotonic(), event))
+        self._ready.set()
+
+    def _evict(self, incoming: Event) -> None:
+        victim = 0
+        if self.policy == "coalesce":
+            if incoming.status == "progress":
+                same = next((i for i, (_, e) in enumerate(self._items) if e.status == "progress"
+                             and e.run_id == incoming.run_id and e.step == incoming.step), None)
+                if same is not None:
+                    queued_at, _ = self._items[same]
+                    del self._items[same]
+                    self._removed(queued_at)
+                    record_event_dropped(self.policy)
+                    return
+            victim = next((i for i, (_, e) in enumerate(self._items) if e.status == "progress"), 0)
+        queued_at, event = self._items[victim]
+        del self._items[victim]
+        self._removed(queued_at)
+        self._dropped[event.run_id] = self._dropped.get(event.run_id, 0) + 1
+        record_event_dropped(self.policy)
+
+    def get_nowait(self) -> Event:
+        if self._dropped:
+            run_id = next(iter(self._dropped))
+            n = self._dropped.pop(run_id)
+            # no id, so a reconnect resumes from the last real event
+            return Event(
+                "", run_id, "bus", "gap",
+                message=f"{n} events dropped", data={"dropped": n, "policy": self.policy},
+            )
+        if not self._items:
+            raise asyncio.QueueEmpty
+        queued_at, event = self._items.popleft()
+        self._removed(queued_at)
+        observe_event_lag(time.monotonic() - queued_at)
+        return event
+
+    async def get(self) -> Event:
+        while self.empty():
+            self._ready.clear()
+            await self._ready.wait()
+        return self.get_nowait()
+
+def _after(events: List[Event], last_id: Optional[str]) -> List[Event]:
+    """
+    Events following `last_id`; all of them if the id is not a sequence number.
+    """
+    if last_id and last_id.isdigit():
+        after = int(last_id)
+        return [e for e in events if e.seq > after]
+    return events
 
 class EventBus:
+    """
+    In-process pub/sub. Subscriptions are indexed by run_id, so publishing
+    touches only that run's subscribers plus the wildcard channel. The most
+    recent events of recent runs are kept in per-run ring buffers for replay.
+    """
+
     def __init__(self) -> None:
-        self._subscribers: Dict[int, asyncio.Queue] = {}
-        self._lock = asyncio.Lock()
-
-    async def subscribe(self) -> asyncio.Queue:
-        q: asyncio.Queue = asyncio.Queue()
-        async with self._lock:
-            self._subscribers[id(q)] = q
-        return q
-
-    async def unsubscribe(self, q: asyncio.Queue) -> None:
-        async with self._lock:
-            self._subscribers.pop(id(q), None)
-
-    async def publish(self, event: RunEvent) -> None:
-        async with self._lock:
-            subs = list(self._subscribers.values())
-        for q in subs:
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self._history: "OrderedDict[str, Deque[Event]]" = OrderedDict()
+        # kept current on the loop, so the metrics thread never walks _channels
+        self._subscribers = 0
+        self._oldest_at = 0.0  # enqueue time of the oldest undelivered event, 0.0 if none
+        set_event_subscribers(0)
+        bind_event_max_lag(self._max_lag)
+
+    def _max_lag(self) -> float:
+        oldest = self._oldest_at
+        return time.monotonic() - oldest if oldest else 0.0
+
+    def _removed(self, queued_at: float) -> None:
+        # only losing the oldest event moves the watermark
+        if queued_at <= self._oldest_at:
+            self._oldest_at = min(
+                (t for subs in self._channels.values() for sub in subs if (t := sub.head_at())),
+                default=0.0,
+            )
+
+    async def subscribe(self, run_id: Optional[str] = None) -> Subscription:
+        sub = Subscription(run_id, settings.EVENT_QUEUE_MAX, settings.EVENT_OVERFLOW_POLICY, self._removed)
+        self._channels.setdefault(sub.channel, set()).add(sub)
+        self._subscribers += 1
+        set_event_subscribers(self._subscribers)
+        return sub
+
+    async def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._channels.get(sub.channel)
+        if subs is not None and sub in subs:
+            subs.discard(sub)
+            if not subs:
+                del self._channels[sub.channel]
+            self._subscribers -= 1
+            set_event_subscribers(self._subscribers)
+            if sub.head_at():
+                self._removed(sub.head_at())
+
+    def _remember(self, event: Event) -> None:
+        ring = self._history.get(event.run_id)
+        if ring is None:
+            ring = self._history[event.run_id] = deque(maxlen=settings.EVENT_HISTORY_MAX)
+            while len(self._history) > settings.EVENT_HISTORY_RUNS:
+                self._history.popitem(last=False)
+        else:
+            self._history.move_to_end(event.run_id)
+        ring.append(event)
+
+    async def history(self, run_id: str, after: Optional[str] = None) -> List[Event]:
+        """
+        Buffered events for a run, oldest first, optionally only those after
+        the event id `after`.
+        """
+        return _after(list(self._history.get(run_id, ())), after)
+
+    async def publish(self, event: Event) -> None:
+        event.wire  # encode once, before fan-out
+        self._remember(event)
+        for channel in (event.run_id, WILDCARD):
+            for sub in tuple(self._channels.get(channel, ())):
+                sub.put(event)
+                if not self._oldest_at:
+                    self._oldest_at = sub.head_at()
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+class SqliteEventBus(EventBus):
+    """
+    Cross-process EventBus over an append-only SQLite table. Events published
+    here are delivered to local subscribers straight away and queued for a
+    writer task that appends them to the log in batches off the event loop;
+    a tail task polls the log for events written by other worker processes
+    and fans them out locally. Both start with the app (start()).
+    """
+
+    def __init__(self, filename: str = "events.db") -> None:
+        super().__init__()
+        self._conn = connect(filename)
+        self._db_lock = threading.Lock()
+        self._origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._tail: Optional[asyncio.Task] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._unwritten: List[tuple] = []
+        self._dirty = asyncio.Event()
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL,"
+            " run_id TEXT NOT NULL, payload TEXT NOT NULL, ts REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS events_ts ON events(ts);"
+            "CREATE INDEX IF NOT EXISTS events_run_id ON events(run_id, seq);"
+        )
+        with self._db_lock:
+            self._last_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+
+    async def start(self) -> None:
+        if self._tail is None or self._tail.done():
+            self._tail = asyncio.create_task(self._follow())
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def subscribe(self, run_id: Optional[str] = None) -> Subscription:
+        await self.start()  # no-op under the app lifespan; covers scripts
+        return await super().subscribe(run_id)
+
+    async def publish(self, event: Event) -> None:
+        await self.start()
+        self._unwritten.append((self._origin, event.run_id, event.payload.decode("utf-8"), time.time()))
+        self._dirty.set()
+        await super().publish(event)
+
+    async def history(self, run_id: str, after: Optional[str] = None) -> List[Event]:
+        """
+        The run's timeline from the shared log, so it includes events
+        published by other workers before this one saw the run, plus this
+        worker's events that are not written yet.
+        """
+        local = await super().history(run_id)  # copied on the loop
+        rows = await asyncio.to_thread(self._read, run_id)
+        events = {e.seq: e for e in (Event.from_json(r["payload"]) for r in rows)}
+        for e in local:
+            events.setdefault(e.seq, e)
+        return _after(sorted(events.values(), key=lambda e: e.seq), after)
+
+    def _read(self, run_id: str) -> list:
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT payload FROM events WHERE run_id = ? ORDER BY seq", (run_id,)
+            ).fetchall()
+
+    def _insert(self, batch: List[tuple]) -> None:
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT INTO events (origin, run_id, payload, ts) VALUES (?, ?, ?, ?)", batch
+            )
+
+    async def _flush(self) -> None:
+        batch, self._unwritten = self._unwritten, []
+        if batch:
             try:
-                q.put_nowait(event)
-            except asyncio.QueueFull:
-                pass
+                await asyncio.to_thread(self._insert, batch)
+            except Exception:
+                log.exception("Event log write failed (%d events dropped from the log)", len(batch))
 
-bus = EventBus()
+    async def _write_loop(self) -> None:
+        # events published while a batch is being written form the next batch
+        try:
+            while True:
+                await self._dirty.wait()
+                self._dirty.clear()
+                await self._flush()
+        finally:
+            # cancelled (close() or loop shutdown): write what is left inline
+            batch, self._unwritten = self._unwritten, []
+            if batch:
+                self._insert(batch)
+
+    def _poll(self):
+        with self._db_lock:
+            return self._conn.execute(
+                "SELECT seq, origin, payload FROM events WHERE seq > ? ORDER BY seq", (self._last_seq,)
+            ).fetchall()
+
+    def _prune(self) -> None:
+        with self._db_lock:
+            self._conn.execute("DELETE FROM events WHERE ts < ?", (time.time() - settings.EVENT_LOG_RETENTION_S,))
+
+    async def _follow(self) -> None:
+        last_prune = time.monotonic()
+        while True:
+            try:
+                for row in await asyncio.to_thread(self._poll):
+                    self._last_seq = row["seq"]
+                    if row["origin"] != self._origin:
+                        await super().publish(Event.from_json(row["payload"]))
+                if time.monotonic() - last_prune > 60:
+                    await asyncio.to_thread(self._prune)
+                    last_prune = time.monotonic()
+            except Exception:
+                log.exception("Event log tail failed")
+            await asyncio.sleep(settings.EVENT_BUS_POLL_S)
+
+    async def close(self) -> None:
+        tasks = [t for t in (self._tail, self._writer) if t is not None]
+        self._tail = self._writer = None
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def _make_bus() -> EventBus:
+    if settings.EVENT_BUS_BACKEND == "memory":
+        return EventBus()
+    return SqliteEventBus()
 
-async def sse_endpoint(request: Request, run_id: Optional[str] = None) -> StreamingResponse:
-    q = await bus.subscribe()
+bus = _make_bus()
+
+async def sse_endpoint(request: Request, run_id: Optional[str] = None,
+                       last_event_id: Optional[str] = None) -> StreamingResponse:
+    """
+    Live events, optionally for one run. Run subscriptions first replay the
+    buffered timeline after `last_event_id` (all of it when not given).
+    """
+    q = await bus.subscribe(run_id)
+    timeline = await bus.history(run_id) if run_id else []
+    backlog = _after(timeline, last_event_id)
+    # events already in the timeline may still arrive live from the log tail
+    replayed = max((e.seq for e in timeline), default=0)
 
     async def event_stream() -> AsyncIterator[bytes]:
         try:
             hello = {"ts": datetime.utcnow().isoformat(), "message": "connected"}
             yield _format_sse(json.dumps(hello), event="hello").encode("utf-8")
+            for event in backlog:
+                yield event.wire
 
             while True:
                 if await request.is_disconnected():
                     break
                 try:
-                    event: RunEvent = await asyncio.wait_for(q.get(), timeout=15)
+                    event: Event = await asyncio.wait_for(q.get(), timeout=15)
                 except asyncio.TimeoutError:
                     yield b": keep-alive\n\n"
                     continue
-                if run_id and event.run_id != run_id:
+                if event.seq and event.seq <= replayed:
                     continue
-                payload = event.model_dump(mode='json')
-                msg = _format_sse(json.dumps(payload), event="run_event", id=event.event_id)
-                yield msg.encode("utf-8")
+                yield event.wire
         finally:
             await bus.unsubscribe(q)
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
+_run_seq: "OrderedDict[str, int]" = OrderedDict()
+
+def _next_id(run_id: str) -> str:
+    # a run publishes from a single worker, so a process-local counter is monotonic
+    n = _run_seq.pop(run_id, 0) + 1
+    _run_seq[run_id] = n
+    while len(_run_seq) > 4096:
+        _run_seq.popitem(last=False)
+    return str(n)
+
 def make_event(run_id: str, step: str, status: str,
                agent: Optional[str] = None, message: Optional[str] = None,
-               duration_ms: Optional[int] = None, data: Optional[dict] = None) -> RunEvent:
-    return RunEvent(
-        event_id=str(uuid.uuid4()),
+               duration_ms: Optional[int] = None, data: Optional[dict] = None) -> Event:
+    return Event(
+        event_id=_next_id(run_id),
         run_id=run_id,
         step=step,
         agent=agent,
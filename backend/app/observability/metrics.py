@@ -1,5 +1,6 @@
 from prometheus_fastapi_instrumentator import Instrumentator
-from prometheus_client import Counter
+from typing import Callable, Dict
+from prometheus_client import Counter, Gauge, Histogram
 
 def init_metrics(app) -> None:
     if getattr(app.state, "metrics_initialized", False):
@@ -18,9 +19,37 @@ def record_groq_usage(model: str, agent: str, prompt_tokens: int, completion_tok
     if completion_tokens:
         _groq_tokens.labels(type="completion", model=model, agent=agent).inc(completion_tokens)
 
+def record_groq_cached(model: str, agent: str, tokens_saved: int) -> None:
+    if tokens_saved:
+        _groq_tokens.labels(type="cached", model=model, agent=agent).inc(tokens_saved)
+
 def record_groq_error(model: str, agent: str) -> None:
     _groq_errors.labels(model=model, agent=agent).inc()
 
+_LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+_groq_latency = Histogram("groq_latency_seconds", "Groq call latency", ["model", "agent"], buckets=_LLM_BUCKETS)
+_groq_ttft    = Histogram("groq_ttft_seconds", "Groq time to first streamed token", ["model", "agent"], buckets=_LLM_BUCKETS)
+
+def observe_groq_latency(model: str, agent: str, seconds: float) -> None:
+    _groq_latency.labels(model=model, agent=agent).observe(seconds)
+
+def observe_groq_ttft(model: str, agent: str, seconds: float) -> None:
+    _groq_ttft.labels(model=model, agent=agent).observe(seconds)
+
+_groq_throttle     = Histogram("groq_throttle_seconds", "Time spent queued by the Groq rate scheduler", ["agent"],
+                               buckets=(0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60))
+_groq_rate_limited = Counter("groq_rate_limited_total", "Groq 429 responses", ["model", "agent"])
+_groq_queue_depth  = Gauge("groq_queue_depth", "Groq calls waiting for rate budget")
+
+def observe_groq_throttle(agent: str, seconds: float) -> None:
+    _groq_throttle.labels(agent=agent).observe(seconds)
+
+def record_groq_rate_limited(model: str, agent: str) -> None:
+    _groq_rate_limited.labels(model=model, agent=agent).inc()
+
+def bind_groq_queue_depth(depth_fn: Callable[[], int]) -> None:
+    _groq_queue_depth.set_function(depth_fn)
+
 _webhook_requests = Counter("webhook_requests_total", "Webhook requests", ["service"])
 _webhook_errors   = Counter("webhook_errors_total", "Webhook errors",   ["service"])
 
@@ -28,4 +57,134 @@ def record_webhook_request(service: str) -> None:
     _webhook_requests.labels(service=service).inc()
 
 def record_webhook_error(service: str) -> None:
-    _webhook_errors.labels(service=service).inc()
\ No newline at end of file
+    _webhook_errors.labels(service=service).inc()
+
+_http_connections = Counter("http_pool_connections_total", "Outbound requests by connection reuse", ["reused"])
+_http_pool_open    = Gauge("http_pool_connections_open", "Open connections in the shared HTTP pool")
+_http_pool_idle    = Gauge("http_pool_connections_idle", "Idle keep-alive connections in the shared HTTP pool")
+_http_pool_waiting = Gauge("http_pool_requests_waiting", "Requests waiting for a pooled connection or host slot")
+
+def record_http_connection(reused: bool) -> None:
+    _http_connections.labels(reused="true" if reused else "false").inc()
+
+def bind_http_pool_stats(stats_fn: Callable[[], Dict[str, int]]) -> None:
+    _http_pool_open.set_function(lambda: stats_fn()["open"])
+    _http_pool_idle.set_function(lambda: stats_fn()["idle"])
+    _http_pool_waiting.set_function(lambda: stats_fn()["waiting"])
+
+_extract_wait = Histogram(
+    "extract_queue_wait_seconds", "Time an extraction waited for a pool worker", ["executor"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+_extract_cpu = Histogram(
+    "extract_cpu_seconds", "CPU time spent per HTML extraction", ["executor"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+def record_extraction(executor: str, queue_wait_s: float, cpu_s: float) -> None:
+    _extract_wait.labels(executor=executor).observe(queue_wait_s)
+    _extract_cpu.labels(executor=executor).observe(cpu_s)
+
+_page_cache_requests = Counter("page_cache_requests_total", "Page cache lookups", ["result"])
+_page_cache_saved    = Counter("page_cache_bytes_saved_total", "Response bytes not downloaded thanks to the page cache")
+
+def record_page_cache(result: str, bytes_saved: int = 0) -> None:
+    _page_cache_requests.labels(result=result).inc()
+    if bytes_saved:
+        _page_cache_saved.inc(bytes_saved)
+
+_search_cache_requests = Counter("search_cache_requests_total", "Search cache lookups", ["provider", "result"])
+
+def record_search_cache(provider: str, result: str) -> None:
+    _search_cache_requests.labels(provider=provider, result=result).inc()
+
+_search_provider_calls = Counter(
+    "search_provider_calls_total", "Provider calls made by federated search", ["provider", "outcome"]
+)
+
+def record_search_provider(provider: str, outcome: str) -> None:
+    _search_provider_calls.labels(provider=provider, outcome=outcome).inc()
+
+
+_run_queue_wait = Histogram(
+    "run_queue_wait_seconds", "Time a research run waited for a worker slot", ["depth"],
+    buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+_runs_pending = Gauge("runs_pending", "Research runs waiting for a worker slot")
+_runs_active  = Gauge("runs_active", "Research runs currently executing")
+
+def observe_run_queue_wait(depth: str, seconds: float) -> None:
+    _run_queue_wait.labels(depth=depth).observe(seconds)
+
+def bind_run_scheduler_stats(pending_fn: Callable[[], int], active_fn: Callable[[], int]) -> None:
+    _runs_pending.set_function(pending_fn)
+    _runs_active.set_function(active_fn)
+
+
+_event_lag = Histogram(
+    "event_delivery_lag_seconds", "Time an event waited in a subscriber buffer",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60),
+)
+_event_dropped     = Counter("event_dropped_total", "Events discarded from full subscriber buffers", ["policy"])
+_event_subscribers = Gauge("event_subscribers", "Open event bus subscriptions")
+_event_max_lag     = Gauge("event_subscriber_max_lag_seconds", "Age of the oldest undelivered event across subscribers")
+
+def observe_event_lag(seconds: float) -> None:
+    _event_lag.observe(seconds)
+
+def record_event_dropped(policy: str) -> None:
+    _event_dropped.labels(policy=policy).inc()
+
+def set_event_subscribers(n: int) -> None:
+    _event_subscribers.set(n)
+
+def bind_event_max_lag(max_lag_fn: Callable[[], float]) -> None:
+    _event_max_lag.set_function(max_lag_fn)
+
+
+_fetch_bytes     = Counter("retriever_fetch_bytes_total", "Page bytes downloaded by the retriever", ["outcome"])
+_fetch_hedged    = Counter("retriever_hedged_fetches_total", "Backup fetches launched because a fetch was slow")
+_fetch_cancelled = Counter("retriever_cancelled_fetches_total", "Fetches cancelled once the retriever had enough docs")
+
+def record_fetch_bytes(outcome: str, n: int) -> None:
+    if n:
+        _fetch_bytes.labels(outcome=outcome).inc(n)
+
+def record_fetch_hedged() -> None:
+    _fetch_hedged.inc()
+
+def record_fetch_cancelled() -> None:
+    _fetch_cancelled.inc()
+
+
+_fetch_host_queue   = Gauge("fetch_host_queue_depth", "Page fetches waiting for a per-host slot", ["host"])
+_fetch_limit        = Gauge("fetch_concurrency_limit", "Current adaptive limit on concurrent page fetches")
+_fetch_robots_block = Counter("fetch_robots_blocked_total", "Page fetches skipped because robots.txt disallows them")
+
+def set_fetch_host_queue(host: str, depth: int) -> None:
+    if depth:
+        _fetch_host_queue.labels(host=host).set(depth)
+    else:
+        # drop idle hosts so the label set stays bounded
+        try:
+            _fetch_host_queue.remove(host)
+        except KeyError:
+            pass
+
+def record_robots_blocked() -> None:
+    _fetch_robots_block.inc()
+
+def bind_fetch_limit(limit_fn: Callable[[], float]) -> None:
+    _fetch_limit.set_function(limit_fn)
+
+
+_download_bytes   = Counter("fetch_download_bytes_total", "Page body bytes by fate: kept for extraction, downloaded then discarded, or declared but never read", ["result"])
+_download_aborted = Counter("fetch_download_aborted_total", "Page downloads stopped early", ["reason"])
+
+def record_download(kept: int = 0, discarded: int = 0, skipped: int = 0) -> None:
+    for result, n in (("kept", kept), ("discarded", discarded), ("skipped", skipped)):
+        if n:
+            _download_bytes.labels(result=result).inc(n)
+
+def record_download_aborted(reason: str) -> None:
+    _download_aborted.labels(reason=reason).inc()
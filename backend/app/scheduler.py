@@ -0,0 +1,151 @@
+from __future__ import annotations
+import asyncio, logging, math, time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+from .config import settings
+from .graph.state import DEPTH_PRESETS
+from .observability.metrics import bind_run_scheduler_stats, observe_run_queue_wait
+
+log = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("run queue is full")
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Job:
+    run_id: str
+    depth: str
+    client: str
+    run: Callable[[], Awaitable[None]]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class RunScheduler:
+    """
+    Bounded executor for research runs. A fixed number of worker slots pull
+    from a pending queue ordered by priority class (the depth preset's
+    priority: quick before standard before deep) and round-robin across
+    clients within a class, so one client's burst cannot starve the others.
+    """
+
+    def __init__(self) -> None:
+        # priority -> client -> jobs; OrderedDict order is the round-robin turn
+        self._classes: Dict[int, "OrderedDict[str, Deque[_Job]]"] = {}
+        self._pending = 0
+        self._active = 0
+        self._avg_run_s = 30.0
+        self._cond: Optional[asyncio.Condition] = None
+        self._workers: List[asyncio.Task] = []
+        bind_run_scheduler_stats(lambda: self._pending, lambda: self._active)
+
+    @staticmethod
+    def _priority(depth: str) -> int:
+        return int(DEPTH_PRESETS.get(depth, DEPTH_PRESETS["standard"]).get("priority", 1))
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._cond = asyncio.Condition()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"run-worker-{i}")
+            for i in range(max(1, settings.RUN_WORKERS))
+        ]
+
+    async def stop(self) -> List[str]:
+        """
+        Cancel the workers (and the runs they are executing) and drop the
+        pending queue. Returns the run_ids of the dropped pending runs so the
+        caller can close them out in the run store.
+        """
+        workers, self._workers = self._workers, []
+        for t in workers:
+            t.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        dropped = [job.run_id for job in self._order()]
+        self._classes.clear()
+        self._pending = 0
+        return dropped
+
+    def is_full(self) -> bool:
+        return self._pending >= settings.RUN_QUEUE_MAX
+
+    def retry_after(self) -> int:
+        """
+        Rough seconds until a pending slot frees up, for the Retry-After header.
+        """
+        workers = max(1, settings.RUN_WORKERS)
+        return max(1, math.ceil(self._avg_run_s * (1 + self._pending) / workers))
+
+    async def submit(self, run_id: str, depth: str, client: str, run: Callable[[], Awaitable[None]]) -> int:
+        """
+        Queue a run and return its 1-based queue position. Raises QueueFull.
+        """
+        if self.is_full():
+            raise QueueFull(self.retry_after())
+        if not self._workers:
+            await self.start()
+        job = _Job(run_id=run_id, depth=depth, client=client or "anonymous", run=run)
+        async with self._cond:
+            # nothing awaits after the job is queued, so the caller finishes
+            # its own bookkeeping before a worker can pick the run up
+            clients = self._classes.setdefault(self._priority(depth), OrderedDict())
+            clients.setdefault(job.client, deque()).append(job)
+            self._pending += 1
+            self._cond.notify()
+        return self.position(run_id) or self._pending
+
+    def _order(self) -> List[_Job]:
+        """
+        Pending jobs in the order they would be dispatched.
+        """
+        out: List[_Job] = []
+        for prio in sorted(self._classes):
+            queues = [list(q) for q in self._classes[prio].values()]
+            for i in range(max((len(q) for q in queues), default=0)):
+                out.extend(q[i] for q in queues if i < len(q))
+        return out
+
+    def position(self, run_id: str) -> Optional[int]:
+        for i, job in enumerate(self._order(), start=1):
+            if job.run_id == run_id:
+                return i
+        return None
+
+    def _pop(self) -> Optional[_Job]:
+        for prio in sorted(self._classes):
+            clients = self._classes[prio]
+            if not clients:
+                continue
+            client, jobs = next(iter(clients.items()))
+            job = jobs.popleft()
+            del clients[client]
+            if jobs:
+                clients[client] = jobs
+            self._pending -= 1
+            return job
+        return None
+
+    async def _worker(self) -> None:
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: self._pending > 0)
+                job = self._pop()
+            if job is None:
+                continue
+            observe_run_queue_wait(job.depth, time.monotonic() - job.enqueued_at)
+            self._active += 1
+            t0 = time.monotonic()
+            try:
+                await job.run()
+            except Exception:
+                log.exception("Scheduled run failed (run_id=%s)", job.run_id)
+            finally:
+                self._active -= 1
+                self._avg_run_s = 0.8 * self._avg_run_s + 0.2 * (time.monotonic() - t0)
+
+scheduler = RunScheduler()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+import asyncio, gzip, hashlib, json, os, shutil, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from ..config import settings
+from .files import ARTIFACTS_DIR, atomic_write, ensure_run_dir
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is always available
+    zstandard = None
+
+BLOBS_DIR = ARTIFACTS_DIR / "blobs"
+MANIFEST = "manifest.json"
+
+# suffix of the precompressed variant for each Content-Encoding
+SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+
+def _link(src: Path, dst: Path) -> None:
+    """
+    Atomically point `dst` at `src`: a hard link where possible, else a copy.
+    """
+    tmp = dst.with_name(f".tmp-{dst.name}")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+def _compress(encoding: str, raw: bytes) -> Optional[bytes]:
+    if encoding == "gzip":
+        return gzip.compress(raw, compresslevel=6, mtime=0)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+    return None
+
+def blob_path(digest: str, encoding: Optional[str] = None) -> Path:
+    return BLOBS_DIR / digest[:2] / (digest + (SUFFIXES[encoding] if encoding else ""))
+
+def _put_blob(raw: bytes) -> Dict[str, Any]:
+    digest = hashlib.sha256(raw).hexdigest()
+    path = blob_path(digest)
+    if not path.exists():
+        atomic_write(path, raw)
+    encodings: List[str] = []
+    if len(raw) >= settings.ARTIFACT_COMPRESS_MIN_BYTES:
+        for enc in settings.ARTIFACT_ENCODINGS:
+            if enc not in SUFFIXES:
+                continue
+            variant = blob_path(digest, enc)
+            if not variant.exists():
+                packed = _compress(enc, raw)
+                # keep a variant only if it actually saves bytes
+                if packed is None or len(packed) >= len(raw):
+                    continue
+                atomic_write(variant, packed)
+            encodings.append(enc)
+    return {"hash": digest, "size": len(raw), "encodings": encodings}
+
+def _write(run_id: str, name: str, raw: bytes, media_type: str) -> Dict[str, Any]:
+    entry = _put_blob(raw)
+    entry.update(media_type=media_type, written_at=time.time())
+    run_dir = ensure_run_dir(run_id)
+    _link(blob_path(entry["hash"]), run_dir / name)
+
+    manifest = _read_manifest(run_id)
+    manifest[name] = entry
+    atomic_write(run_dir / MANIFEST, json.dumps(manifest, indent=2).encode("utf-8"))
+    return entry
+
+def _read_manifest(run_id: str) -> Dict[str, Any]:
+    p = ARTIFACTS_DIR / run_id / MANIFEST
+    try:
+        return json.loads(p.read_bytes())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+# serializes manifest read-modify-write within this process
+_lock: Optional[asyncio.Lock] = None
+
+async def write_artifact(run_id: str, name: str, content: str | bytes, media_type: str = "text/plain") -> str:
+    """
+    Store `content` as a content-addressed blob (plus compressed variants),
+    link it into the run directory as `name` and record it in the run's
+    manifest. Runs off the event loop; returns the artifact's path.
+    """
+    global _lock
+    if _lock is None:
+        _lock = asyncio.Lock()
+    raw = content.encode("utf-8") if isinstance(content, str) else content
+    async with _lock:
+        await asyncio.to_thread(_write, run_id, name, raw, media_type)
+    return str(ARTIFACTS_DIR / run_id / name)
+
+async def read_artifact(run_id: str, name: str) -> Optional[str]:
+    p = ARTIFACTS_DIR / run_id / name
+    try:
+        return (await asyncio.to_thread(p.read_bytes)).decode("utf-8")
+    except FileNotFoundError:
+        return None
+
+def manifest_entry(run_id: str, name: str) -> Optional[Dict[str, Any]]:
+    return _read_manifest(run_id).get(name)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+import asyncio, hashlib, mmap, shutil
+from pathlib import Path
+from typing import Dict
+from .files import ARTIFACTS_DIR, atomic_write, ensure_run_dir
+
+DocHandle = Dict[str, object]
+
+def _docs_dir(run_id: str) -> Path:
+    d = ensure_run_dir(run_id) / "docs"
+    d.mkdir(exist_ok=True)
+    return d
+
+def _store(run_id: str, text: str) -> tuple[str, int]:
+    raw = text.encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+    path = _docs_dir(run_id) / f"{digest}.txt"
+    if not path.exists():
+        atomic_write(path, raw)
+    return digest, len(raw)
+
+async def put_doc(run_id: str, url: str, title: str, text: str) -> DocHandle:
+    """
+    Store a document body under ARTIFACTS_DIR/<run_id>/docs/<sha256>.txt (off
+    the event loop) and return the compact handle that travels in graph
+    state instead.
+    """
+    digest, length = await asyncio.to_thread(_store, run_id, text)
+    return {"url": url, "title": title, "hash": digest, "length": length}
+
+def read_doc(run_id: str, doc: DocHandle, limit: int | None = None) -> str:
+    """
+    Body of a stored document, memory-mapped so only the pages read (the
+    first `limit` bytes, if given) are loaded.
+    """
+    if not doc.get("length"):
+        return ""
+    path = _docs_dir(run_id) / f"{doc['hash']}.txt"
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        raw = m[:limit] if limit else m[:]
+    return raw.decode("utf-8", errors="ignore")
+
+def drop_docs(run_id: str) -> None:
+    """
+    Remove a run's stored bodies; they are only read while the run is live.
+    """
+    shutil.rmtree(ARTIFACTS_DIR / run_id / "docs", ignore_errors=True)
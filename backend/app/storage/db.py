@@ -0,0 +1,17 @@
+from __future__ import annotations
+import sqlite3
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+def connect(filename: str) -> sqlite3.Connection:
+    """
+    Open a SQLite database under DATA_DIR in WAL mode. Connections are shared
+    by the event loop and worker threads, so same-thread checks are disabled.
+    """
+    conn = sqlite3.connect(DATA_DIR / filename, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -1,5 +1,5 @@
 from __future__ import annotations
-import os
+import os, tempfile
 from pathlib import Path
 
 ARTIFACTS_DIR = Path(__file__).resolve().parents[2] / "artifacts"
@@ -10,11 +10,20 @@ def ensure_run_dir(run_id: str) -> Path:
     d.mkdir(parents=True, exist_ok=True)
     return d
 
-def write_text(run_id: str, filename: str, content: str) -> str:
-    d = ensure_run_dir(run_id)
-    p = d / filename
-    p.write_text(content, encoding="utf-8")
-    return str(p)
+def atomic_write(path: Path, data: bytes) -> None:
+    """
+    Write `data` to a temp file beside `path` and rename it into place, so
+    readers never see a partial file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
 
 def read_text(run_id: str, filename: str) -> str | None:
     p = ARTIFACTS_DIR / run_id / filename
@@ -0,0 +1,55 @@
+from __future__ import annotations
+import threading, time
+from typing import Dict, Iterable
+from ..config import settings
+from ..tools.urls import normalize_url
+from .db import connect
+
+def _signed(fp: int) -> int:
+    # SQLite integers are signed 64-bit
+    return fp - (1 << 64) if fp >= 1 << 63 else fp
+
+class FingerprintIndex:
+    """
+    SimHash fingerprints of extracted pages keyed by normalized URL, shared
+    across runs so known mirrors can be skipped before they are fetched.
+    """
+
+    def __init__(self, filename: str = "fingerprints.db") -> None:
+        self._filename = filename
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = connect(self._filename)
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                " url TEXT PRIMARY KEY, fp INTEGER NOT NULL, seen_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS fingerprints_seen_at ON fingerprints(seen_at);"
+            )
+            self._conn.execute(
+                "DELETE FROM fingerprints WHERE seen_at < ?", (time.time() - settings.FINGERPRINT_TTL,)
+            )
+        return self._conn
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, int]:
+        keys = {normalize_url(u): u for u in urls}
+        if not keys:
+            return {}
+        marks = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT url, fp FROM fingerprints WHERE url IN ({marks}) AND seen_at > ?",
+                (*keys, time.time() - settings.FINGERPRINT_TTL),
+            ).fetchall()
+        return {keys[r["url"]]: r["fp"] & ((1 << 64) - 1) for r in rows}
+
+    def put(self, url: str, fp: int) -> None:
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO fingerprints (url, fp, seen_at) VALUES (?, ?, ?)",
+                (normalize_url(url), _signed(fp), time.time()),
+            )
+
+fingerprints = FingerprintIndex()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+import threading, time
+from typing import Any, Dict, Optional
+from ..config import settings
+from .db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url           TEXT PRIMARY KEY,
+    body_hash     TEXT NOT NULL,
+    title         TEXT NOT NULL DEFAULT '',
+    text          TEXT NOT NULL DEFAULT '',
+    etag          TEXT,
+    last_modified TEXT,
+    raw_size      INTEGER NOT NULL DEFAULT 0,
+    size          INTEGER NOT NULL DEFAULT 0,
+    fetched_at    REAL NOT NULL,
+    accessed_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages(accessed_at);
+"""
+
+class PageCache:
+    """
+    On-disk cache of fetched pages keyed by normalized URL. Holds the raw body
+    hash, extracted title/text and HTTP validators for conditional revalidation.
+    Total stored size is bounded; least recently accessed pages are evicted first.
+    """
+
+    def __init__(self, filename: str = "pages.db", max_bytes: Optional[int] = None) -> None:
+        self._filename = filename
+        self._max_bytes = max_bytes
+        self._conn = None
+        self._lock = threading.Lock()
+        self._total = 0
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = connect(self._filename)
+            self._conn.executescript(_SCHEMA)
+            self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        return self._conn
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes if self._max_bytes is not None else settings.PAGE_CACHE_MAX_BYTES
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db().execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        return dict(row)
+
+    def put(
+        self,
+        url: str,
+        *,
+        body_hash: str,
+        title: str,
+        text: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        raw_size: int,
+    ) -> None:
+        size = len(text.encode("utf-8")) + len(title.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            old = db.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, body_hash, title, text, etag, last_modified, raw_size, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, body_hash, title, text, etag, last_modified, raw_size, size, now, now),
+            )
+            self._total += size - (old["size"] if old else 0)
+            self._evict()
+
+    def touch(self, url: str, *, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Mark a cached page as freshly validated (304, or 200 with an unchanged body).
+        """
+        now = time.time()
+        with self._lock:
+            self._db().execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, now, etag, last_modified, url),
+            )
+
+    def _evict(self) -> None:
+        limit = self.max_bytes
+        if self._total <= limit:
+            return
+        target = int(limit * 0.9)
+        drop = []
+        for row in self._conn.execute("SELECT url, size FROM pages ORDER BY accessed_at ASC"):
+            if self._total <= target:
+                break
+            drop.append((row["url"],))
+            self._total -= row["size"]
+        self._conn.executemany("DELETE FROM pages WHERE url = ?", drop)
+
+    @staticmethod
+    def is_fresh(page: Dict[str, Any], ttl: float) -> bool:
+        return (time.time() - page["fetched_at"]) < ttl
+
+    @staticmethod
+    def validators(page: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if not page:
+            return {}
+        headers = {}
+        if page.get("etag"):
+            headers["If-None-Match"] = page["etag"]
+        if page.get("last_modified"):
+            headers["If-Modified-Since"] = page["last_modified"]
+        return headers
+
+page_cache = PageCache()
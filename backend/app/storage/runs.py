@@ -1,15 +1,34 @@
 from __future__ import annotations
-import uuid
+import base64, threading, uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
+from ..config import settings
 from ..models import RunStatus
+from .db import connect
+
+_FINAL = ("completed", "error")
+
+def _ts(dt: datetime) -> str:
+    # fixed width so stored timestamps sort lexically
+    return dt.isoformat(timespec="microseconds")
+
+def _encode_cursor(created_at: str, run_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at}|{run_id}".encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    created_at, sep, run_id = raw.partition("|")
+    if not sep or not created_at or not run_id:
+        raise ValueError("bad cursor")
+    return created_at, run_id
 
 class RunStore:
     def __init__(self) -> None:
         self._runs: Dict[str, RunStatus] = {}
 
-    def create(self, *, topic: str | None = None, depth: str | None = None) -> RunStatus:
-        run_id = str(uuid.uuid4())
+    def create(self, *, topic: str | None = None, depth: str | None = None, run_id: str | None = None) -> RunStatus:
+        run_id = run_id or str(uuid.uuid4())
         rs = RunStatus(
         run_id=run_id, 
         status="pending", 
@@ -41,5 +60,163 @@ class RunStore:
 
     def list_all(self) -> List[RunStatus]:
         return sorted(self._runs.values(), key=lambda r: r.created_at, reverse=True)
-    
-store = RunStore()
+
+    def page(
+        self,
+        *,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        topic: Optional[str] = None,
+    ) -> Tuple[List[RunStatus], Optional[str]]:
+        runs = sorted(self._runs.values(), key=lambda r: (_ts(r.created_at), r.run_id), reverse=True)
+        if status:
+            runs = [r for r in runs if r.status == status]
+        if topic:
+            runs = [r for r in runs if topic.lower() in (r.topic or "").lower()]
+        if cursor:
+            after = _decode_cursor(cursor)
+            runs = [r for r in runs if (_ts(r.created_at), r.run_id) < after]
+        if 0 < limit < len(runs):
+            last = runs[limit - 1]
+            return runs[:limit], _encode_cursor(_ts(last.created_at), last.run_id)
+        return runs, None
+
+    def count(self, status: Optional[str] = None) -> int:
+        if status:
+            return sum(1 for r in self._runs.values() if r.status == status)
+        return len(self._runs)
+
+class SqliteRunStore:
+    """
+    Durable RunStore backed by a shared SQLite file, so every uvicorn worker
+    process sees the same runs. Finished runs never change again, so they are
+    kept in a small LRU; pending and running runs are always read from disk
+    because another worker may be updating them.
+    """
+
+    def __init__(self, filename: str = "runs.db") -> None:
+        self._conn = connect(filename)
+        self._lock = threading.Lock()
+        # reads get their own connection (WAL readers don't block the writer),
+        # so a slow page() scan never holds up status updates from the loop
+        self._reader = connect(filename)
+        self._read_lock = threading.Lock()
+        self._hot: "OrderedDict[str, RunStatus]" = OrderedDict()
+        # sync endpoints call in from the threadpool while the loop writes too
+        self._hot_lock = threading.Lock()
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " run_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at TEXT NOT NULL,"
+            " started_at TEXT, finished_at TEXT, error TEXT, topic TEXT, depth TEXT);"
+            "CREATE INDEX IF NOT EXISTS runs_created_at ON runs(created_at, run_id);"
+            "CREATE INDEX IF NOT EXISTS runs_status_created_at ON runs(status, created_at, run_id);"
+        )
+
+    @staticmethod
+    def _row(row) -> RunStatus:
+        return RunStatus(**dict(row))
+
+    def _remember(self, rs: RunStatus) -> None:
+        if rs.status not in _FINAL:
+            return
+        with self._hot_lock:
+            self._hot[rs.run_id] = rs
+            self._hot.move_to_end(rs.run_id)
+            while len(self._hot) > settings.RUN_CACHE_MAX_ENTRIES:
+                self._hot.popitem(last=False)
+
+    def _update(self, run_id: str, **fields) -> None:
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE runs SET {cols} WHERE run_id = ?", (*fields.values(), run_id))
+
+    def create(self, *, topic: str | None = None, depth: str | None = None, run_id: str | None = None) -> RunStatus:
+        rs = RunStatus(
+            run_id=run_id or str(uuid.uuid4()),
+            status="pending",
+            created_at=datetime.utcnow(),
+            topic=topic,
+            depth=depth,
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, status, created_at, topic, depth) VALUES (?, ?, ?, ?, ?)",
+                (rs.run_id, rs.status, _ts(rs.created_at), topic, depth),
+            )
+        return rs
+
+    def start(self, run_id: str) -> None:
+        self._update(run_id, status="running", started_at=_ts(datetime.utcnow()))
+
+    def finish(self, run_id: str) -> None:
+        self._update(run_id, status="completed", finished_at=_ts(datetime.utcnow()))
+
+    def error(self, run_id: str, err: str) -> None:
+        self._update(run_id, status="error", error=err, finished_at=_ts(datetime.utcnow()))
+
+    def get(self, run_id: str) -> Optional[RunStatus]:
+        with self._hot_lock:
+            hit = self._hot.get(run_id)
+            if hit is not None:
+                self._hot.move_to_end(run_id)
+                return hit
+        with self._read_lock:
+            row = self._reader.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        rs = self._row(row)
+        self._remember(rs)
+        return rs
+
+    def list_all(self) -> List[RunStatus]:
+        return self.page(limit=-1)[0]
+
+    def page(
+        self,
+        *,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        topic: Optional[str] = None,
+    ) -> Tuple[List[RunStatus], Optional[str]]:
+        """
+        Newest-first keyset page. Returns (runs, next_cursor); next_cursor is
+        None on the last page. The topic filter is a substring match that no
+        index can serve: rows are scanned newest first until the page fills,
+        so a rare topic can mean a full table scan.
+        """
+        where, args = [], []
+        if status:
+            where.append("status = ?")
+            args.append(status)
+        if topic:
+            where.append("topic LIKE ? ESCAPE '\\'")
+            args.append("%" + topic.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if cursor:
+            where.append("(created_at, run_id) < (?, ?)")
+            args.extend(_decode_cursor(cursor))
+        sql = "SELECT * FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, run_id DESC LIMIT ?"
+        args.append(limit + 1 if limit >= 0 else -1)
+        with self._read_lock:
+            rows = self._reader.execute(sql, args).fetchall()
+        more = limit >= 0 and len(rows) > limit
+        rows = rows[:limit] if more else rows
+        runs = [self._row(r) for r in rows]
+        return runs, (_encode_cursor(rows[-1]["created_at"], rows[-1]["run_id"]) if more else None)
+
+    def count(self, status: Optional[str] = None) -> int:
+        with self._read_lock:
+            if status:
+                return self._reader.execute("SELECT COUNT(*) FROM runs WHERE status = ?", (status,)).fetchone()[0]
+            return self._reader.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+def _make_store():
+    if settings.RUN_STORE_BACKEND == "memory":
+        return RunStore()
+    return SqliteRunStore()
+
+store = _make_store()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import asyncio, json, threading, time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+from .db import connect
+
+_PRUNE_EVERY_S = 300  # expired rows are deleted at most this often, on write
+
+class TieredCache:
+    """
+    JSON value cache with an in-memory LRU tier over an optional SQLite tier.
+    Entries expire after `ttl` seconds; expired rows are pruned as new ones
+    are written. Limits are callables so they follow runtime settings
+    changes. `column` names the value column, so existing tables keep their
+    schema.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        table: str,
+        *,
+        ttl: Callable[[], float],
+        max_entries: Callable[[], int],
+        persistent: Callable[[], bool],
+        column: str = "value",
+    ) -> None:
+        self._filename = filename
+        self._table = table
+        self._column = column
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._persistent = persistent
+        self._mem: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._conn = None
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl()
+
+    def _db(self):
+        if not self._persistent():
+            return None
+        if self._conn is None:
+            self._conn = connect(self._filename)
+            self._conn.executescript(
+                f"CREATE TABLE IF NOT EXISTS {self._table} ("
+                f" key TEXT PRIMARY KEY, {self._column} TEXT NOT NULL, expires_at REAL NOT NULL);"
+                f"CREATE INDEX IF NOT EXISTS {self._table}_expires_at ON {self._table}(expires_at);"
+            )
+            self._conn.execute(f"DELETE FROM {self._table} WHERE expires_at < ?", (time.time(),))
+            self._pruned_at = time.time()
+        return self._conn
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._mem[key] = (expires_at, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self._max_entries():
+            self._mem.popitem(last=False)
+
+    def _load(self, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                f"SELECT {self._column}, expires_at FROM {self._table} WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone() if db else None
+        return (row["expires_at"], json.loads(row[self._column])) if row else None
+
+    def _store(self, key: str, value: Any, expires_at: float) -> None:
+        raw = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            db = self._db()
+            if not db:
+                return
+            db.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, {self._column}, expires_at) VALUES (?, ?, ?)",
+                (key, raw, expires_at),
+            )
+            now = time.time()
+            if now - self._pruned_at > _PRUNE_EVERY_S:
+                db.execute(f"DELETE FROM {self._table} WHERE expires_at < ?", (now,))
+                self._pruned_at = now
+
+    def _mem_get(self, key: str, now: float) -> Optional[Any]:
+        hit = self._mem.get(key)
+        if hit is not None:
+            if hit[0] > now:
+                self._mem.move_to_end(key)
+                return hit[1]
+            del self._mem[key]
+        return None
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Cached value or None; the SQLite tier is read in a worker thread."""
+        now = time.time()
+        value = self._mem_get(key, now)
+        if value is not None or not self._persistent():
+            return value
+        row = await asyncio.to_thread(self._load, key, now)
+        if row is None:
+            return None
+        self._remember(key, *row)
+        return row[1]
+
+    async def aput(self, key: str, value: Any) -> None:
+        """Cache `value`; the SQLite tier is written in a worker thread."""
+        expires_at = time.time() + self.ttl
+        self._remember(key, expires_at, value)
+        if self._persistent():
+            await asyncio.to_thread(self._store, key, value, expires_at)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+import re
+from typing import Dict, List, Sequence
+import numpy as np
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+_STOP = frozenset(
+    "a an and are as at be by for from how in into is it of on or that the this to was what when "
+    "where which who why with vs versus".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in _WORD.findall((text or "").lower()) if w not in _STOP and len(w) > 1]
+
+def bm25(
+    docs: Sequence[str],
+    queries: Sequence[str],
+    weights: Sequence[float] | None = None,
+    *,
+    k1: float = 1.5,
+    b: float = 0.75,
+) -> np.ndarray:
+    """
+    Weighted sum of Okapi BM25 scores of every doc against every query,
+    computed as one (docs x terms) matrix. Returns one score per doc.
+    """
+    doc_tokens = [tokenize(d) for d in docs]
+    query_tokens = [tokenize(q) for q in queries]
+    vocab: Dict[str, int] = {}
+    for toks in query_tokens:
+        for t in toks:
+            vocab.setdefault(t, len(vocab))
+    if not docs or not vocab:
+        return np.zeros(len(docs), dtype=np.float32)
+
+    tf = np.zeros((len(docs), len(vocab)), dtype=np.float32)
+    for i, toks in enumerate(doc_tokens):
+        for t in toks:
+            j = vocab.get(t)
+            if j is not None:
+                tf[i, j] += 1
+    lengths = np.asarray([len(t) for t in doc_tokens], dtype=np.float32)
+    avg = float(lengths.mean()) or 1.0
+    df = (tf > 0).sum(axis=0)
+    n = len(docs)
+    idf = np.log(1 + (n - df + 0.5) / (df + 0.5)).astype(np.float32)
+    norm = k1 * (1 - b + b * lengths / avg)
+    term_scores = idf * tf * (k1 + 1) / (tf + norm[:, None])
+
+    q = np.zeros((len(vocab), len(queries)), dtype=np.float32)
+    for c, toks in enumerate(query_tokens):
+        for t in toks:
+            q[vocab[t], c] = 1.0
+    w = np.asarray(weights if weights is not None else [1.0] * len(queries), dtype=np.float32)
+    return term_scores @ q @ w
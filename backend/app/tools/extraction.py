@@ -0,0 +1,127 @@
+from __future__ import annotations
+import asyncio, logging, multiprocessing, os, time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Tuple
+import trafilatura
+from trafilatura.utils import load_html
+from ..config import settings
+from ..observability.metrics import record_extraction
+from .simhash import simhash
+
+log = logging.getLogger(__name__)
+
+_DROP = ("script", "style", "noscript")
+
+def _doc_text(doc) -> str:
+    # trafilatura 1.x returns a dict, 2.x a Document
+    if doc is None:
+        return ""
+    text = doc.get("text") if isinstance(doc, dict) else getattr(doc, "text", None)
+    return (text or "").strip()
+
+def _extract_worker(html: str, url: Optional[str], submitted_at: float) -> Tuple[str, str, float, float]:
+    """
+    Runs inside the pool. Parses the document once and derives both title and
+    main text from the same tree. Returns (title, text, queue_wait_s, cpu_s).
+    """
+    wait = max(0.0, time.time() - submitted_at)
+    cpu0 = time.thread_time()
+    title, text = "", ""
+    try:
+        tree = load_html(html)
+    except Exception:
+        tree = None
+    if tree is not None:
+        title = " ".join((tree.findtext(".//title") or "").split())
+        try:
+            doc = trafilatura.bare_extraction(
+                tree,
+                url=url,
+                include_comments=False,
+                include_tables=False,
+                favor_recall=True,
+                no_fallback=False,
+            )
+            text = _doc_text(doc)
+        except Exception:
+            text = ""
+        if not text:
+            try:
+                # bare_extraction prunes the tree it is given; start over
+                tree = load_html(html)
+                for el in tree.iter(*_DROP):
+                    el.drop_tree()
+                lines = "\n".join(tree.itertext()).splitlines()
+                text = "\n".join(line.strip() for line in lines if line.strip())
+            except Exception:
+                text = ""
+    return title, text, wait, time.thread_time() - cpu0
+
+
+class ExtractionEngine:
+    """
+    Runs HTML extraction off the event loop. Uses a ProcessPoolExecutor by
+    default and falls back to a thread pool when processes are unavailable.
+    """
+
+    def __init__(self) -> None:
+        self._executor: Optional[Executor] = None
+        self.kind = "none"
+
+    def _workers(self) -> int:
+        return settings.EXTRACT_WORKERS or min(8, os.cpu_count() or 2)
+
+    def _start_threads(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self._workers(), thread_name_prefix="extract")
+        self.kind = "thread"
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if (settings.EXTRACT_EXECUTOR or "process").lower() == "process":
+            try:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self.kind = "process"
+                return
+            except (OSError, ImportError, NotImplementedError) as e:
+                log.warning("Process pool unavailable (%r); extracting in threads", e)
+        self._start_threads()
+
+    def close(self) -> None:
+        if self._executor is None:
+            return
+        ex, self._executor, self.kind = self._executor, None, "none"
+        ex.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn: Callable, *args: Any) -> Tuple[Any, str]:
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        executor, kind = self._executor, self.kind
+        try:
+            return await loop.run_in_executor(executor, fn, *args), kind
+        except BrokenProcessPool:
+            if self._executor is executor:
+                log.warning("Extraction process pool broke; switching to threads")
+                self.close()
+                self._start_threads()
+            return await loop.run_in_executor(self._executor, fn, *args), self.kind
+
+    async def extract(self, html: str, url: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Returns (title, text). text keeps one line per block; empty if nothing usable.
+        """
+        (title, text, wait, cpu), kind = await self._run(_extract_worker, html, url, time.time())
+        record_extraction(kind, wait, cpu)
+        return title, text
+
+    async def fingerprint(self, text: str) -> int:
+        """SimHash of extracted text, computed in the pool."""
+        fp, _ = await self._run(simhash, text)
+        return fp
+
+extractor = ExtractionEngine()
@@ -1,9 +1,15 @@
 from __future__ import annotations
-import asyncio
+import asyncio, codecs, hashlib, re
 from typing import Any, Dict, List, Optional, Tuple
 import httpx
-from bs4 import BeautifulSoup
-import trafilatura
+from ..config import settings
+from ..graph.state import DEPTH_PRESETS
+from ..observability.metrics import record_download, record_download_aborted, record_page_cache
+from ..storage.page_cache import page_cache
+from .http_client import http_pool
+from .politeness import fetch_scheduler
+from .extraction import extractor
+from .urls import normalize_url
 
 HEADERS = {
     "User-Agent": (
@@ -13,70 +19,177 @@ HEADERS = {
     )
 }
 
-async def _download(client: httpx.AsyncClient, url: str) -> Tuple[str, Optional[str]]:
-    try:
-        r = await client.get(url, headers=HEADERS, follow_redirects=True)
-        if r.status_code >= 400:
-            return url, None
-        return url, r.text
-    except Exception:
-        return url, None
+_HTML_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_.:-]+)""", re.I)
 
-def _clean_with_trafilatura(html: str, url: str) -> str:
-    try:
-        text = trafilatura.extract(
-            html,
-            url=url,
-            include_comments=False,
-            include_tables=False,
-            favor_recall=True,
-            no_fallback=False,
-        )
-        if text:
-            return text.strip()
-    except Exception:
-        pass
-    return ""
+def _page(url: str, title: str, text: str) -> Dict[str, Any]:
+    return {"url": url, "title": title, "content": text}
 
-def _fallback_bs4(html: str) -> str:
+def _declared_length(r: httpx.Response) -> int:
     try:
-        soup = BeautifulSoup(html, "lxml")
-        for tag in soup(["script", "style", "noscript"]):
-            tag.extract()
-        text = soup.get_text(separator="\n")
-        return "\n".join(line.strip() for line in text.splitlines() if line.strip())
-    except Exception:
-        return ""
+        return max(0, int(r.headers.get("content-length", "")))
+    except ValueError:
+        return 0
 
-def _title_from_html(html: str) -> str:
+def _decoder(r: httpx.Response, head: bytes) -> codecs.IncrementalDecoder:
+    # header charset, else a <meta charset> in the first chunk, else UTF-8
+    name = r.charset_encoding
+    if not name:
+        m = _META_CHARSET.search(head[:4096])
+        name = m.group(1).decode("ascii") if m else "utf-8"
     try:
-        soup = BeautifulSoup(html, "lxml")
-        t = soup.title.string if soup.title and soup.title.string else ""
-        return t.strip()
-    except Exception:
-        return ""
+        return codecs.getincrementaldecoder(name)(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
 
-async def fetch_one(url: str, timeout: Optional[int] = None) -> Optional[Dict[str, Any]]:
+async def _read_html(
+    r: httpx.Response, max_bytes: int, html_bytes: int, meter: Optional[Dict[str, int]]
+) -> Optional[Tuple[str, str, int]]:
     """
-    Fetch and extract a single URL. timeout is seconds; if None defaults to 20.
+    Stream an HTML body: skip non-HTML types and bodies declared larger than
+    max_bytes without reading them, stop after html_bytes (a prefix is enough
+    for extraction), and decode the charset incrementally as chunks arrive.
+    max_bytes counts bytes on the wire: Content-Length is the encoded size
+    (compressed under a Content-Encoding), and bodies sent without one are
+    checked against r.num_bytes_downloaded as they stream. html_bytes counts
+    decoded bytes. Returns (html, sha256 of the bytes read, bytes read) or None.
     """
-    to = timeout or 20
-    async with httpx.AsyncClient(timeout=to) as client:
-        _, html = await _download(client, url)
-    if not html:
+    declared = _declared_length(r)
+    ctype = r.headers.get("content-type", "").split(";")[0].strip().lower()
+    if ctype and ctype not in _HTML_TYPES:
+        record_download_aborted("content_type")
+        record_download(skipped=declared)
         return None
+    if declared > max_bytes:
+        record_download_aborted("too_large")
+        record_download(skipped=declared)
+        return None
+
+    digest = hashlib.sha256()
+    decoder: Optional[codecs.IncrementalDecoder] = None
+    parts: List[str] = []
+    size = received = 0
+    async for chunk in r.aiter_bytes():
+        if meter is not None:
+            meter["bytes"] = meter.get("bytes", 0) + len(chunk)
+        received += len(chunk)
+        if decoder is None:
+            if not ctype and b"\x00" in chunk[:1024]:
+                # untyped binary body
+                record_download_aborted("content_type")
+                record_download(discarded=received, skipped=max(0, declared - r.num_bytes_downloaded))
+                return None
+            decoder = _decoder(r, chunk)
+        if r.num_bytes_downloaded > max_bytes:
+            record_download_aborted("too_large")
+            record_download(discarded=received)
+            return None
+        chunk = chunk[: html_bytes - size]
+        size += len(chunk)
+        digest.update(chunk)
+        parts.append(decoder.decode(chunk))
+        if size >= html_bytes:
+            record_download_aborted("truncated")
+            # declared length is on the wire (possibly compressed)
+            record_download(discarded=received - size, skipped=max(0, declared - r.num_bytes_downloaded))
+            break
+    if decoder is not None:
+        parts.append(decoder.decode(b"", final=True))
+    record_download(kept=size)
+    return "".join(parts), digest.hexdigest(), size
 
-    text = _clean_with_trafilatura(html, url) or _fallback_bs4(html)
-    if not text:
+async def fetch_page(
+    url: str,
+    *,
+    timeout: Optional[float] = None,
+    ttl: Optional[float] = None,
+    headers: Optional[Dict[str, str]] = None,
+    meter: Optional[Dict[str, int]] = None,
+    max_bytes: Optional[int] = None,
+    html_bytes: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetch and extract a URL through the page cache. Fresh entries (younger than
+    ttl seconds) are served without a request; stale ones are revalidated with
+    If-None-Match/If-Modified-Since. Requests go through the fetch scheduler
+    (robots.txt, per-host limits, adaptive global concurrency); disallowed URLs
+    return None. Bodies are streamed under the max_bytes/html_bytes caps
+    (depth preset defaults; see _read_html). Returns {"url","title","content"}
+    or None. meter["bytes"], if given, counts body bytes as they arrive, so callers can
+    tell what a cancelled fetch had already downloaded.
+    """
+    to = timeout or 20
+    ttl = DEPTH_PRESETS["standard"]["cache_ttl"] if ttl is None else ttl
+    max_bytes = max_bytes or DEPTH_PRESETS["standard"]["max_bytes"]
+    html_bytes = min(max_bytes, html_bytes or DEPTH_PRESETS["standard"]["html_bytes"])
+    use_cache = settings.PAGE_CACHE_ENABLED
+    key = normalize_url(url)
+    # the cache is SQLite; keep its calls off the event loop
+    cached = await asyncio.to_thread(page_cache.get, key) if use_cache else None
+
+    if cached and page_cache.is_fresh(cached, ttl):
+        record_page_cache("hit", cached["raw_size"])
+        return _page(url, cached["title"], cached["text"])
+
+    if not await fetch_scheduler.allowed(url):
+        return None
+    client = await http_pool.get_client()
+    req_headers = {**HEADERS, **(headers or {}), **page_cache.validators(cached)}
+    try:
+        async with fetch_scheduler.slot(url) as slot, \
+                client.stream("GET", url, headers=req_headers, follow_redirects=True, timeout=to) as r:
+            slot.status = r.status_code
+            slot.retry_after = r.headers.get("retry-after")
+            etag = r.headers.get("etag")
+            last_modified = r.headers.get("last-modified")
+            if r.status_code == 304 and cached:
+                await asyncio.to_thread(page_cache.touch, key, etag=etag, last_modified=last_modified)
+                record_page_cache("revalidated", cached["raw_size"])
+                return _page(url, cached["title"], cached["text"])
+            if r.status_code >= 400:
+                return None
+            body = await _read_html(r, max_bytes, html_bytes, meter)
+    except Exception:
+        return None
+    if body is None:
         return None
 
-    title = _title_from_html(html) or url
-    return {"url": url, "title": title, "content": text}
+    html, body_hash, size = body
+    if cached and cached["body_hash"] == body_hash:
+        await asyncio.to_thread(page_cache.touch, key, etag=etag, last_modified=last_modified)
+        record_page_cache("unchanged")
+        return _page(url, cached["title"], cached["text"])
+
+    title, text = await extractor.extract(html, url)
+    if use_cache:
+        await asyncio.to_thread(
+            page_cache.put,
+            key,
+            body_hash=body_hash,
+            title=title,
+            text=text,
+            etag=etag,
+            last_modified=last_modified,
+            raw_size=size,
+        )
+    record_page_cache("miss")
+    return _page(url, title, text)
+
+async def fetch_one(url: str, timeout: Optional[int] = None, ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Fetch and extract a single URL. timeout is seconds; if None defaults to 20.
+    """
+    page = await fetch_page(url, timeout=timeout, ttl=ttl)
+    if not page or not page["content"]:
+        return None
+    page["title"] = page["title"] or url
+    return page
 
 async def fetch_many(
     urls: List[str],
     concurrency: int = 5,
     timeout: Optional[int] = None,
+    ttl: Optional[float] = None,
 ) -> List[Dict[str, Any]]:
     """
     Fetch a list of URLs concurrently. Respects the same timeout per request.
@@ -86,7 +199,7 @@ async def fetch_many(
 
     async def _task(u: str):
         async with sem:
-            doc = await fetch_one(u, timeout=timeout)
+            doc = await fetch_one(u, timeout=timeout, ttl=ttl)
             if doc:
                 out.append(doc)
 
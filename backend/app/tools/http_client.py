@@ -0,0 +1,156 @@
+from __future__ import annotations
+import asyncio, importlib.util, logging
+from typing import Any, Callable, Dict, Optional
+import httpx
+from ..config import settings
+from ..observability.metrics import bind_http_pool_stats, record_http_connection
+
+log = logging.getLogger(__name__)
+
+_MAX_HOSTS = 1024  # idle hosts' slots are dropped beyond this many
+
+
+class _HostLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps the pooled transport with a per-host concurrency cap and connection
+    reuse tracking. The host slot is held until the response body is closed.
+    """
+
+    def __init__(self, inner: httpx.AsyncHTTPTransport, per_host: int) -> None:
+        self._inner = inner
+        self._per_host = max(1, per_host)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._users: Dict[str, int] = {}  # requests holding or waiting for each host's slot
+        self.waiting = 0
+
+    def _slot(self, host: str) -> asyncio.Semaphore:
+        sem = self._hosts.get(host)
+        if sem is None:
+            if len(self._hosts) >= _MAX_HOSTS:
+                for h in [h for h in self._hosts if not self._users.get(h)]:
+                    del self._hosts[h]
+            sem = self._hosts[host] = asyncio.Semaphore(self._per_host)
+        return sem
+
+    def _release(self, host: str, sem: asyncio.Semaphore) -> None:
+        sem.release()
+        self._done(host)
+
+    def _done(self, host: str) -> None:
+        left = self._users.pop(host, 1) - 1
+        if left:
+            self._users[host] = left
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        sem = self._slot(host)
+        self._users[host] = self._users.get(host, 0) + 1
+        self.waiting += 1
+        try:
+            await sem.acquire()
+        except BaseException:
+            self._done(host)
+            raise
+        finally:
+            self.waiting -= 1
+
+        opened = False
+
+        async def _trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal opened
+            if event_name == "connection.connect_tcp.started":
+                opened = True
+
+        request.extensions = {**request.extensions, "trace": _trace}
+        try:
+            response = await self._inner.handle_async_request(request)
+        except BaseException:
+            self._release(host, sem)
+            raise
+        record_http_connection(reused=not opened)
+        response.stream = _ReleasingStream(response.stream, lambda: self._release(host, sem))
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    def pool_stats(self) -> Dict[str, int]:
+        pool = getattr(self._inner, "_pool", None)
+        conns = list(getattr(pool, "connections", []) or [])
+        queued = [r for r in getattr(pool, "_requests", []) if r.is_queued()]
+        return {
+            "open": len(conns),
+            "idle": sum(1 for c in conns if c.is_idle()),
+            "waiting": self.waiting + len(queued),
+        }
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]) -> None:
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class HttpClientManager:
+    """
+    Application-scoped pooled httpx client. Started and closed by the FastAPI
+    lifespan; created lazily when used outside the app (scripts, tests).
+    """
+
+    def __init__(self) -> None:
+        self._client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[_HostLimitedTransport] = None
+
+    def _http2_enabled(self) -> bool:
+        if not settings.HTTP2:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            log.warning("HTTP2=true but the 'h2' package is not installed; using HTTP/1.1")
+            return False
+        return True
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        inner = httpx.AsyncHTTPTransport(limits=limits, http2=self._http2_enabled())
+        self._transport = _HostLimitedTransport(inner, settings.HTTP_MAX_PER_HOST)
+        self._client = httpx.AsyncClient(
+            transport=self._transport,
+            timeout=settings.HTTP_TIMEOUT,
+        )
+        bind_http_pool_stats(self.stats)
+
+    async def close(self) -> None:
+        if self._client is None:
+            return
+        client, self._client, self._transport = self._client, None, None
+        await client.aclose()
+
+    async def get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            await self.start()
+        return self._client
+
+    def stats(self) -> Dict[str, int]:
+        if self._transport is None:
+            return {"open": 0, "idle": 0, "waiting": 0}
+        return self._transport.pool_stats()
+
+http_pool = HttpClientManager()
@@ -0,0 +1,228 @@
+from __future__ import annotations
+import asyncio, time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from ..config import settings
+from ..observability.metrics import bind_fetch_limit, record_robots_blocked, set_fetch_host_queue
+from .http_client import http_pool
+
+_MAX_GATES = 1024
+_ROBOTS_MAX_ENTRIES = 2048
+_ROBOTS_RETRY_S = 600     # how long an unreachable robots.txt is cached
+_ROBOTS_TIMEOUT_S = 5.0
+
+def _retry_after(value: Optional[str]) -> float:
+    try:
+        return max(0.0, float(value or 0))
+    except ValueError:
+        return 0.0
+
+class _HostGate:
+    """
+    Per-host fetch slots with a minimum gap between request starts.
+    """
+
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self.sem = asyncio.Semaphore(max(1, settings.FETCH_PER_HOST))
+        self.next_at = 0.0
+        self.waiting = 0
+        self.active = 0
+
+    def idle(self, now: float) -> bool:
+        return not self.waiting and not self.active and self.next_at <= now
+
+    def defer(self, seconds: float) -> None:
+        self.next_at = max(self.next_at, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        self.waiting += 1
+        set_fetch_host_queue(self.host, self.waiting)
+        try:
+            await self.sem.acquire()
+            try:
+                # reserve the next start time before sleeping so queued
+                # requests space out behind each other
+                now = time.monotonic()
+                start = max(now, self.next_at)
+                self.next_at = start + settings.FETCH_HOST_INTERVAL_S
+                if start > now:
+                    await asyncio.sleep(start - now)
+            except BaseException:
+                self.sem.release()
+                raise
+        finally:
+            self.waiting -= 1
+            set_fetch_host_queue(self.host, self.waiting)
+        self.active += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self.sem.release()
+
+class _AimdLimiter:
+    """
+    Global cap on concurrent page fetches. Each fast success raises the limit
+    by 1/limit (about +1 per limit's worth of requests); an error, throttle or
+    response slower than FETCH_LATENCY_TARGET_S halves it, at most once per
+    target interval.
+    """
+
+    def __init__(self) -> None:
+        self.limit = float(max(settings.FETCH_CONCURRENCY_MIN, settings.FETCH_CONCURRENCY_MAX // 2))
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_cut = 0.0
+
+    async def acquire(self) -> None:
+        while self.active >= int(self.limit):
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self._wake()  # pass the wakeup on
+                raise
+            finally:
+                if fut in self._waiters:
+                    self._waiters.remove(fut)
+        self.active += 1
+
+    def release(self, ok: Optional[bool], latency_s: float) -> None:
+        """ok is None for fetches that were cancelled; they do not move the limit."""
+        self.active -= 1
+        lo, hi = settings.FETCH_CONCURRENCY_MIN, settings.FETCH_CONCURRENCY_MAX
+        if ok is not None:
+            target = settings.FETCH_LATENCY_TARGET_S
+            now = time.monotonic()
+            if ok and latency_s <= target:
+                self.limit = min(hi, self.limit + 1 / self.limit)
+            elif now - self._last_cut >= target:
+                self.limit = max(lo, self.limit / 2)
+                self._last_cut = now
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.active
+        while free > 0 and self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                free -= 1
+
+class RobotsCache:
+    """
+    Parsed robots.txt per origin, fetched once and kept for ROBOTS_TTL.
+    A missing file (4xx) allows everything; an unreachable one is treated
+    the same but re-checked after a few minutes.
+    """
+
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[str, Tuple[float, Optional[RobotFileParser]]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    async def allowed(self, url: str) -> bool:
+        parts = urlsplit(url)
+        if not parts.scheme or not parts.netloc:
+            return True
+        origin = f"{parts.scheme}://{parts.netloc}"
+        parser = await self._parser(origin)
+        return parser is None or parser.can_fetch(settings.ROBOTS_USER_AGENT, url)
+
+    async def _parser(self, origin: str) -> Optional[RobotFileParser]:
+        hit = self._entries.get(origin)
+        if hit and hit[0] > time.monotonic():
+            self._entries.move_to_end(origin)
+            return hit[1]
+        pending = self._pending.get(origin)
+        if pending is None:
+            # one robots.txt request per origin, shared by concurrent callers
+            pending = asyncio.ensure_future(self._load(origin))
+            self._pending[origin] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(origin, None))
+        return await asyncio.shield(pending)
+
+    async def _load(self, origin: str) -> Optional[RobotFileParser]:
+        parser: Optional[RobotFileParser] = None
+        ttl = settings.ROBOTS_TTL
+        try:
+            client = await http_pool.get_client()
+            r = await client.get(f"{origin}/robots.txt", follow_redirects=True, timeout=_ROBOTS_TIMEOUT_S)
+            if r.status_code < 300:
+                parser = RobotFileParser()
+                parser.parse(r.text.splitlines())
+            elif r.status_code >= 500:
+                ttl = _ROBOTS_RETRY_S
+        except Exception:
+            ttl = _ROBOTS_RETRY_S
+        self._entries[origin] = (time.monotonic() + ttl, parser)
+        while len(self._entries) > _ROBOTS_MAX_ENTRIES:
+            self._entries.popitem(last=False)
+        return parser
+
+@dataclass
+class FetchSlot:
+    status: Optional[int] = None
+    retry_after: Optional[str] = None
+
+class FetchScheduler:
+    """
+    Admission for outbound page fetches: robots.txt check, a per-host slot
+    with request spacing, then a global adaptive slot.
+    """
+
+    def __init__(self) -> None:
+        self._gates: Dict[str, _HostGate] = {}
+        self.limiter = _AimdLimiter()
+        self.robots = RobotsCache()
+        bind_fetch_limit(lambda: self.limiter.limit)
+
+    def _gate(self, host: str) -> _HostGate:
+        gate = self._gates.get(host)
+        if gate is None:
+            if len(self._gates) >= _MAX_GATES:
+                now = time.monotonic()
+                for h in [h for h, g in self._gates.items() if g.idle(now)]:
+                    del self._gates[h]
+            gate = self._gates[host] = _HostGate(host)
+        return gate
+
+    async def allowed(self, url: str) -> bool:
+        if not settings.ROBOTS_ENABLED or await self.robots.allowed(url):
+            return True
+        record_robots_blocked()
+        return False
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[FetchSlot]:
+        """
+        Hold a host slot and a global slot for one request. Set status (and
+        retry_after) on the yielded FetchSlot so the outcome can steer the
+        global limit; 429/503 also push back the host's next request.
+        """
+        gate = self._gate((urlsplit(url).hostname or "").lower())
+        await gate.acquire()
+        try:
+            await self.limiter.acquire()
+            slot = FetchSlot()
+            t0 = time.monotonic()
+            ok: Optional[bool] = False
+            try:
+                yield slot
+                ok = slot.status is not None and slot.status != 429 and slot.status < 500
+            except asyncio.CancelledError:
+                ok = None
+                raise
+            finally:
+                self.limiter.release(ok, time.monotonic() - t0)
+                if slot.status in (429, 503):
+                    gate.defer(max(settings.FETCH_HOST_INTERVAL_S, _retry_after(slot.retry_after)))
+        finally:
+            gate.release()
+
+fetch_scheduler = FetchScheduler()
@@ -2,12 +2,15 @@ from __future__ import annotations
 from typing import Callable, List, Optional, Dict, Any
 import asyncio
 from ...config import settings
+from ...observability.metrics import record_search_provider
 from .tavily import tavily_search
 from .duckduckgo import ddg_search
 from .serpapi import serpapi_search
+from .cache import cache_key, search_cache
+from .fusion import page_key, rrf_merge
 
 # All providers must expose this signature:
-# async def search(query: str, max_results: int, domains: Optional[List[str]]) -> List[Dict[str, Any]]
+# async def search(query: str, max_results: int, domains: Optional[List[str]], timeout: float = 20) -> List[Dict[str, Any]]
 
 def _with_domains(query: str, domains: Optional[List[str]]) -> str:
     if not domains:
@@ -16,23 +19,97 @@ def _with_domains(query: str, domains: Optional[List[str]]) -> str:
     sites = " OR ".join([f"site:{d}" for d in domains])
     return f"({query}) ({sites})"
 
-def get_search_provider() -> Callable[[str, int, Optional[List[str]]], "asyncio.Future"]:
-    name = (settings.SEARCH_PROVIDER or "tavily").lower().strip()
+def _cached(provider: str, search_fn, abandonable: bool = False):
+    async def _search(query: str, max_results: int, domains: Optional[List[str]], timeout: float = 20):
+        key = cache_key(provider, query, domains, max_results)
+        return await search_cache.get_or_fetch(
+            provider, key, lambda: search_fn(query, max_results, domains, timeout), abandonable=abandonable
+        )
+    return _search
+
+def _uncached_provider(name: str) -> Callable[[str, int, Optional[List[str]]], "asyncio.Future"]:
     if name == "tavily":
         api_key = settings.TAVILY_API_KEY
-        async def _search(query: str, max_results: int, domains: Optional[List[str]]):
-            return await tavily_search(query, max_results=max_results, domains=domains, api_key=api_key)
+        async def _search(query: str, max_results: int, domains: Optional[List[str]], timeout: float = 20):
+            return await tavily_search(query, max_results=max_results, domains=domains, api_key=api_key, timeout=timeout)
         return _search
 
     if name == "serpapi":
         api_key = settings.SERPAPI_API_KEY
-        async def _search(query: str, max_results: int, domains: Optional[List[str]]):
+        async def _search(query: str, max_results: int, domains: Optional[List[str]], timeout: float = 20):
             q = _with_domains(query, domains)
-            return await serpapi_search(q, max_results=max_results, api_key=api_key)
+            return await serpapi_search(q, max_results=max_results, api_key=api_key, timeout=timeout)
         return _search
 
     # default: duckduckgo (no key)
-    async def _search(query: str, max_results: int, domains: Optional[List[str]]):
+    async def _search(query: str, max_results: int, domains: Optional[List[str]], timeout: float = 20):
         q = _with_domains(query, domains)
-        return await ddg_search(q, max_results=max_results)
+        return await ddg_search(q, max_results=max_results, timeout=timeout)
+    return _search
+
+_FUSE_MARGIN_S = 0.25  # kept back from `timeout` to cancel stragglers and fuse
+
+def _federated(providers: Dict[str, Callable]):
+    """
+    Query every provider at once and fuse the rankings (RRF over normalized
+    URLs). In "first_k" mode the search returns as soon as the fused list has
+    max_results unique URLs and the providers still running are cancelled.
+    Providers still running just before `timeout` are cancelled too and the
+    answers so far are fused, so a caller's wait_for never discards them.
+    A failing provider just drops out.
+    """
+    async def _search(query: str, max_results: int, domains: Optional[List[str]], timeout: float = 20):
+        first_k = (settings.SEARCH_FEDERATED_MODE or "all").lower().strip() == "first_k"
+        loop = asyncio.get_running_loop()
+        budget = max(0.0, timeout - min(_FUSE_MARGIN_S, timeout * 0.1))
+        deadline = loop.time() + budget
+        tasks = {
+            asyncio.ensure_future(fn(query, max_results, domains, budget)): name
+            for name, fn in providers.items()
+        }
+        lists: Dict[str, List[Dict[str, Any]]] = {}
+        pending = set(tasks)
+        try:
+            while pending:
+                left = deadline - loop.time()
+                if left <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=left, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.cancelled() or t.exception() is not None:
+                        record_search_provider(tasks[t], "error")
+                        continue
+                    record_search_provider(tasks[t], "ok")
+                    lists[tasks[t]] = t.result() or []
+                if first_k and pending and len(_fuse(providers, lists)) >= max_results:
+                    break
+        finally:
+            for t in pending:
+                t.cancel()
+                record_search_provider(tasks[t], "cancelled")
+            if pending:
+                await asyncio.wait(pending)
+        return _fuse(providers, lists)[:max_results]
     return _search
+
+def _fuse(providers: Dict[str, Callable], lists: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    # fixed provider order keeps ties stable whichever provider answered first
+    return rrf_merge([lists[name] for name in providers if name in lists], key=page_key)
+
+def _federated_names() -> List[str]:
+    names = []
+    if settings.TAVILY_API_KEY:
+        names.append("tavily")
+    if settings.SERPAPI_API_KEY:
+        names.append("serpapi")
+    return names + ["duckduckgo"]
+
+def get_search_provider() -> Callable[[str, int, Optional[List[str]]], "asyncio.Future"]:
+    name = (settings.SEARCH_PROVIDER or "tavily").lower().strip()
+    if name == "federated":
+        # first_k cancels the slower providers on purpose; let that reach upstream
+        first_k = (settings.SEARCH_FEDERATED_MODE or "all").lower().strip() == "first_k"
+        return _federated({n: _cached(n, _uncached_provider(n), first_k) for n in _federated_names()})
+    if name not in ("tavily", "serpapi"):
+        name = "duckduckgo"
+    return _cached(name, _uncached_provider(name))
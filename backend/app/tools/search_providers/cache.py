@@ -0,0 +1,100 @@
+from __future__ import annotations
+import asyncio, json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from ...config import settings
+from ...observability.metrics import record_search_cache
+from ...storage.tiered_cache import TieredCache
+
+Results = List[Dict[str, Any]]
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+def cache_key(provider: str, query: str, domains: Optional[List[str]], max_results: int) -> str:
+    doms = sorted({d.strip().lower() for d in (domains or []) if d and d.strip()})
+    return json.dumps([provider, normalize_query(query), doms, int(max_results)], separators=(",", ":"))
+
+class SearchCache:
+    """
+    Two-tier cache for provider results: an in-memory LRU in front of an
+    optional SQLite table. Concurrent misses for the same key share a single
+    upstream call (single-flight).
+    """
+
+    def __init__(self, filename: str = "search.db") -> None:
+        self._store = TieredCache(
+            filename,
+            "search_results",
+            ttl=lambda: settings.SEARCH_CACHE_TTL,
+            max_entries=lambda: settings.SEARCH_CACHE_MAX_ENTRIES,
+            persistent=lambda: settings.SEARCH_CACHE_SQLITE,
+            column="results",  # the table predates TieredCache
+        )
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._keep: Set[str] = set()  # in-flight keys some caller wants cached
+
+    async def get(self, key: str) -> Optional[Results]:
+        return await self._store.aget(key)
+
+    async def put(self, key: str, results: Results) -> None:
+        await self._store.aput(key, results)
+
+    async def get_or_fetch(
+        self, provider: str, key: str, fetch: Callable[[], Awaitable[Results]], *, abandonable: bool = False
+    ) -> Results:
+        """
+        Cached results, else the shared upstream call's. A cancelled caller
+        leaves the call running so it still fills the cache, unless every
+        caller that joined it passed `abandonable` (federated first_k, which
+        cancels the providers it no longer needs): then the last one to leave
+        cancels it.
+        """
+        if settings.SEARCH_CACHE_TTL <= 0:
+            return await fetch()
+
+        task = self._inflight.get(key)
+        if task is None:
+            cached = await self.get(key)
+            if cached is not None:
+                record_search_cache(provider, "hit")
+                return [dict(r) for r in cached]
+            task = self._inflight.get(key)  # another caller may have started it meanwhile
+        if task is not None:
+            record_search_cache(provider, "shared")
+        else:
+            record_search_cache(provider, "miss")
+
+            async def _run() -> Results:
+                try:
+                    results = await fetch()
+                    if results:
+                        await self.put(key, results)
+                    return results
+                finally:
+                    self._forget(key, asyncio.current_task())
+
+            task = asyncio.ensure_future(_run())
+            self._inflight[key] = task
+        if not abandonable:
+            self._keep.add(key)
+        # shield so one cancelled caller doesn't cancel the call others are waiting on
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            results = await asyncio.shield(task)
+        finally:
+            left = self._waiters.pop(key, 1) - 1
+            if left:
+                self._waiters[key] = left
+            elif not task.done() and key not in self._keep:
+                # unregister first so a new caller starts a fresh call
+                self._forget(key, task)
+                task.cancel()
+        return [dict(r) for r in results]
+
+    def _forget(self, key: str, task: Optional[asyncio.Task]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._keep.discard(key)
+
+search_cache = SearchCache()
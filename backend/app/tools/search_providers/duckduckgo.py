@@ -3,10 +3,10 @@ from typing import Any, Dict, List, Optional
 import asyncio
 from duckduckgo_search import DDGS
 
-async def ddg_search(query: str, *, max_results: int = 6) -> List[Dict[str, Any]]:
+async def ddg_search(query: str, *, max_results: int = 6, timeout: float = 10) -> List[Dict[str, Any]]:
     # DDG is sync; run it in a thread to avoid blocking the loop
     def _run():
-        with DDGS() as ddgs:
+        with DDGS(timeout=max(1, int(timeout))) as ddgs:
             res = ddgs.text(
                 keywords=query,
                 region="wt-wt",
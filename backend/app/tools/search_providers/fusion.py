@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Sequence
+from ..urls import normalize_url
+
+def page_key(url: str) -> str:
+    """
+    normalize_url without the scheme and a leading "www.", which providers
+    report inconsistently for the same page.
+    """
+    rest = normalize_url(url).partition("://")[2]
+    return rest[4:] if rest.startswith("www.") else rest
+
+def rrf_merge(
+    result_lists: Sequence[List[Dict[str, Any]]],
+    *,
+    k: int = 60,
+    weights: Sequence[float] | None = None,
+    key: Callable[[str], str] = normalize_url,
+) -> List[Dict[str, Any]]:
+    """
+    Reciprocal rank fusion: each list contributes weight / (k + rank) to an
+    item's score. Items are matched by normalized URL; the first copy seen is
+    kept and annotated with its fused score under "rrf".
+    """
+    scores: Dict[str, float] = {}
+    items: Dict[str, Dict[str, Any]] = {}
+    for i, results in enumerate(result_lists):
+        w = weights[i] if weights else 1.0
+        for rank, item in enumerate(results, start=1):
+            url = item.get("url") or ""
+            if not url:
+                continue
+            u = key(url)
+            scores[u] = scores.get(u, 0.0) + w / (k + rank)
+            items.setdefault(u, item)
+    ordered = sorted(scores, key=lambda u: scores[u], reverse=True)
+    return [{**items[u], "rrf": round(scores[u], 6)} for u in ordered]
@@ -1,11 +1,12 @@
 from __future__ import annotations
 from typing import List, Dict, Any, Optional
-import httpx
+from ..http_client import http_pool
 
 async def serpapi_search(  # Changed from 'search' to 'serpapi_search'
     query: str,
     max_results: int = 5,
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    timeout: float = 20,
 ) -> List[Dict[str, Any]]:
     """
     Google results via SerpAPI.
@@ -20,10 +21,10 @@ async def serpapi_search(  # Changed from 'search' to 'serpapi_search'
         "api_key": api_key,
     }
     
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get("https://serpapi.com/search.json", params=params)
-        r.raise_for_status()
-        data = r.json()
+    client = await http_pool.get_client()
+    r = await client.get("https://serpapi.com/search.json", params=params, timeout=timeout)
+    r.raise_for_status()
+    data = r.json()
 
     out: List[Dict[str, Any]] = []
     for it in data.get("organic_results", []):
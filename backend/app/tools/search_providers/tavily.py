@@ -1,6 +1,6 @@
 from __future__ import annotations
-import httpx
 from typing import Any, Dict, List, Optional
+from ..http_client import http_pool
 
 API_URL = "https://api.tavily.com/search"
 
@@ -10,6 +10,7 @@ async def tavily_search(
     max_results: int = 6,
     domains: Optional[List[str]] = None,
     api_key: Optional[str] = None,
+    timeout: float = 20,
 ) -> List[Dict[str, Any]]:
     if not api_key:
         # graceful fallback: behave like empty results when key isn't set
@@ -26,10 +27,10 @@ async def tavily_search(
     if domains:
         payload["include_domains"] = domains
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.post(API_URL, json=payload)
-        r.raise_for_status()
-        data = r.json()
+    client = await http_pool.get_client()
+    r = await client.post(API_URL, json=payload, timeout=timeout)
+    r.raise_for_status()
+    data = r.json()
 
     results: List[Dict[str, Any]] = []
     for item in data.get("results", []):
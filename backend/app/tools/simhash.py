@@ -0,0 +1,33 @@
+from __future__ import annotations
+import hashlib, re
+from typing import List
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+def _shingles(text: str, size: int, max_words: int) -> List[str]:
+    words = _WORD.findall(text.lower())[:max_words]
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+def simhash(text: str, *, size: int = 3, max_words: int = 3000) -> int:
+    """
+    64-bit SimHash over word `size`-shingles of the first `max_words` words.
+    Near-duplicate texts differ in only a few bits.
+    """
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in _shingles(text, size, max_words)
+    ]
+    if not hashes:
+        return 0
+    half = len(hashes) / 2
+    fp = 0
+    for bit in range(64):
+        mask = 1 << bit
+        if sum(1 for h in hashes if h & mask) > half:
+            fp |= mask
+    return fp
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
@@ -0,0 +1,43 @@
+"""
+Event fan-out microbenchmark: events/sec through the in-process EventBus with
+many subscribers on one run, each reading the SSE bytes it would send.
+
+    python -m tests.bench_events [subscribers] [events]
+"""
+import asyncio, json, sys, time
+from app.config import settings
+from app.models import RunEvent
+from app.observability.events import EventBus, _format_sse, make_event
+
+
+async def _bench(subscribers: int, events: int, legacy: bool) -> float:
+    settings.EVENT_QUEUE_MAX = events + 1
+    bus = EventBus()
+    subs = [await bus.subscribe("bench") for _ in range(subscribers)]
+    t0 = time.perf_counter()
+    for i in range(events):
+        event = make_event("bench", "summarize", "progress", agent="summarizer",
+                           message="summarized", data={"i": i, "url": "https://example.com"})
+        model = RunEvent(**event.to_dict()) if legacy else None
+        await bus.publish(event)
+        for sub in subs:
+            e = sub.get_nowait()
+            if legacy:
+                # per-subscriber encoding, as sse_endpoint used to do
+                _format_sse(json.dumps(model.model_dump(mode="json")), event="run_event", id=e.event_id).encode("utf-8")
+            else:
+                e.wire
+    return events / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    subscribers = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    for legacy in (True, False):
+        rate = asyncio.run(_bench(subscribers, events, legacy))
+        label = "encode per subscriber" if legacy else "encode once"
+        print(f"{label:>22}: {rate:10.1f} events/s  ({rate * subscribers:12.0f} deliveries/s, {subscribers} subscribers)")
+
+
+if __name__ == "__main__":
+    main()
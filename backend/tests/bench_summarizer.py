@@ -0,0 +1,45 @@
+"""
+Extractive summarizer throughput on synthetic pages sized like a deep run.
+
+    python -m tests.bench_summarizer [docs] [words_per_doc] [repeats]
+"""
+import random, sys, time
+from app.agents.summarizer import extract_summaries
+from app.graph.state import DEPTH_PRESETS
+
+_VOCAB = (
+    "boomerang lift drag airfoil wing spin torque precession gyroscope throw return angle velocity "
+    "flight physics rotation axis pressure blade leading trailing edge air speed arc wind hunter sport"
+).split()
+
+
+def _page(rng: random.Random, words: int) -> str:
+    out, n = [], 0
+    while n < words:
+        k = rng.randint(8, 30)
+        s = " ".join(rng.choice(_VOCAB) for _ in range(k))
+        out.append(s[0].upper() + s[1:] + ".")
+        n += k
+    return " ".join(out)
+
+
+def main() -> None:
+    preset = DEPTH_PRESETS["deep"]
+    docs = int(sys.argv[1]) if len(sys.argv) > 1 else preset["max_sources"]
+    words = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    rng = random.Random(7)
+    texts = [_page(rng, words) for _ in range(docs)]
+    budget = int(preset["summary_words"] * 0.6)
+
+    extract_summaries(texts, "boomerang flight physics", budget)  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        extract_summaries(texts, "boomerang flight physics", budget)
+    per_run = (time.perf_counter() - t0) / repeats
+    print(f"{docs} docs x {words} words: {per_run * 1000:.1f} ms/run, "
+          f"{docs / per_run:.0f} docs/s, {docs * words / per_run / 1e6:.2f} M words/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import numpy as np
+from app.tools.bm25 import bm25, tokenize
+
+def test_tokenize_drops_stopwords_and_single_chars():
+    assert tokenize("What is the Physics of a Boomerang?") == ["physics", "boomerang"]
+
+def test_relevant_doc_scores_highest():
+    docs = [
+        "cooking pasta with tomato sauce",
+        "boomerang physics: lift, spin and gyroscopic precession",
+        "boomerang shop opening hours",
+    ]
+    scores = bm25(docs, ["boomerang physics"])
+    assert int(np.argmax(scores)) == 1
+    assert scores[0] == 0
+
+def test_query_weights():
+    docs = ["boomerang", "physics"]
+    scores = bm25(docs, ["boomerang", "physics"], [1.0, 0.5])
+    assert scores[0] > scores[1] > 0
+
+def test_no_query_terms():
+    assert not bm25(["anything"], ["the of"]).any()
+    assert len(bm25([], ["boomerang"])) == 0
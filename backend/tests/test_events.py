@@ -0,0 +1,58 @@
+from app.observability.events import EventBus, Subscription, make_event
+
+def drain(sub):
+    out = []
+    while not sub.empty():
+        out.append(sub.get_nowait())
+    return out
+
+def test_drop_oldest_reports_gap():
+    sub = Subscription("r1", maxsize=2, policy="drop_oldest")
+    for i in range(4):
+        sub.put(make_event("r1", "fetch", "progress", message=str(i)))
+    events = drain(sub)
+    assert events[0].status == "gap"
+    assert events[0].data["dropped"] == 2
+    assert [e.message for e in events[1:]] == ["2", "3"]
+
+def test_coalesce_replaces_progress_of_same_run_and_step():
+    sub = Subscription("r1", maxsize=2, policy="coalesce")
+    sub.put(make_event("r1", "fetch", "started"))
+    for i in range(3):
+        sub.put(make_event("r1", "fetch", "progress", message=str(i)))
+    events = drain(sub)
+    # superseded progress is not a gap
+    assert [(e.status, e.message) for e in events] == [("started", None), ("progress", "2")]
+
+def test_coalesce_evicts_progress_before_other_events():
+    sub = Subscription("r1", maxsize=2, policy="coalesce")
+    sub.put(make_event("r1", "fetch", "progress"))
+    sub.put(make_event("r1", "fetch", "completed"))
+    sub.put(make_event("r1", "summarize", "started"))
+    events = drain(sub)
+    assert [e.status for e in events] == ["gap", "completed", "started"]
+
+def test_gaps_are_counted_per_run():
+    sub = Subscription(None, maxsize=1, policy="drop_oldest")
+    sub.put(make_event("a", "plan", "started"))
+    sub.put(make_event("b", "plan", "started"))
+    sub.put(make_event("a", "plan", "completed"))
+    gaps = {e.run_id: e.data["dropped"] for e in drain(sub) if e.status == "gap"}
+    assert gaps == {"a": 1, "b": 1}
+
+async def test_bus_tracks_subscribers_and_oldest_undelivered_event():
+    bus = EventBus()
+    a = await bus.subscribe("r1")
+    b = await bus.subscribe()
+    assert bus._subscribers == 2 and bus._oldest_at == 0.0
+    await bus.publish(make_event("r1", "plan", "started"))
+    assert bus._oldest_at == a.head_at() > 0
+    held_by_b = b.head_at()
+    await bus.publish(make_event("r1", "plan", "completed"))
+    a.get_nowait()
+    assert bus._oldest_at == held_by_b
+    b.get_nowait()
+    assert bus._oldest_at > held_by_b
+    await bus.unsubscribe(a)
+    b.get_nowait()
+    assert bus._subscribers == 1 and bus._oldest_at == 0.0 and bus._max_lag() == 0.0
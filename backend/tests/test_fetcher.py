@@ -0,0 +1,42 @@
+import httpx
+from app.tools.fetcher import _read_html
+
+class Chunks(httpx.AsyncByteStream):
+    def __init__(self, *chunks: bytes) -> None:
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        for c in self.chunks:
+            yield c
+
+def response(*chunks: bytes, **headers: str) -> httpx.Response:
+    headers = {k.replace("_", "-"): v for k, v in headers.items()}
+    return httpx.Response(200, headers=headers, stream=Chunks(*chunks))
+
+async def test_reads_html():
+    meter = {}
+    html, digest, size = await _read_html(response(b"<p>hi</p>", content_type="text/html"), 1000, 1000, meter)
+    assert html == "<p>hi</p>" and size == 9 and meter["bytes"] == 9 and len(digest) == 64
+
+async def test_skips_non_html_content_type():
+    assert await _read_html(response(b"%PDF-1.7", content_type="application/pdf"), 1000, 1000, None) is None
+
+async def test_skips_declared_oversize_body():
+    r = response(b"x" * 10, content_type="text/html", content_length="5000")
+    assert await _read_html(r, 1000, 1000, None) is None
+
+async def test_skips_untyped_binary():
+    assert await _read_html(response(b"\x89PNG\x00\x00"), 1000, 1000, None) is None
+
+async def test_truncates_at_html_bytes():
+    html, _, size = await _read_html(response(b"a" * 6, b"b" * 6, content_type="text/html"), 1000, 8, None)
+    assert html == "aaaaaabb" and size == 8
+
+async def test_decodes_meta_charset_across_chunks():
+    body = '<meta charset="iso-8859-1"><p>caf\xe9</p>'.encode("latin-1")
+    html, _, _ = await _read_html(response(body[:30], body[30:], content_type="text/html"), 1000, 1000, None)
+    assert "café" in html
+
+async def test_aborts_undeclared_body_past_max_bytes():
+    r = response(b"<p>" + b"x" * 7, b"y" * 10, content_type="text/html")
+    assert await _read_html(r, 15, 1000, None) is None
@@ -0,0 +1,25 @@
+from app.tools.search_providers.fusion import page_key, rrf_merge
+
+def test_page_key_ignores_scheme_and_www():
+    assert page_key("http://www.example.com/a") == page_key("https://example.com/a")
+    assert page_key("https://example.com/a") != page_key("https://example.com/b")
+
+def test_rrf_merge_rewards_agreement():
+    a = [{"url": "https://x.com/1"}, {"url": "https://x.com/2"}]
+    b = [{"url": "https://x.com/2"}, {"url": "https://x.com/3"}]
+    merged = rrf_merge([a, b])
+    assert [r["url"] for r in merged] == ["https://x.com/2", "https://x.com/1", "https://x.com/3"]
+    assert merged[0]["rrf"] > merged[1]["rrf"]
+
+def test_rrf_merge_keeps_first_copy_and_skips_missing_urls():
+    a = [{"url": "http://www.x.com/1", "title": "first"}, {"title": "no url"}]
+    b = [{"url": "https://x.com/1", "title": "second"}]
+    merged = rrf_merge([a, b], key=page_key)
+    assert len(merged) == 1
+    assert merged[0]["title"] == "first"
+
+def test_rrf_merge_weights():
+    a = [{"url": "https://x.com/1"}]
+    b = [{"url": "https://x.com/2"}]
+    merged = rrf_merge([a, b], weights=[1.0, 2.0])
+    assert merged[0]["url"] == "https://x.com/2"
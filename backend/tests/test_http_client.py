@@ -0,0 +1,35 @@
+import asyncio
+import httpx
+from app.tools import http_client
+from app.tools.http_client import _HostLimitedTransport
+
+def ok(request=None):
+    # a streamed body, like a real transport's; a preloaded one is never closed
+    return httpx.Response(200, stream=httpx.ByteStream(b"ok"))
+
+def client(per_host, handler):
+    return httpx.AsyncClient(transport=_HostLimitedTransport(httpx.MockTransport(handler), per_host))
+
+async def test_per_host_cap():
+    active, peak = {}, {}
+
+    async def handler(request):
+        host = request.url.host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return ok()
+
+    async with client(2, handler) as c:
+        await asyncio.gather(*(c.get(f"http://{h}.test/") for h in "ab" for _ in range(5)))
+    assert peak == {"a.test": 2, "b.test": 2}
+
+async def test_idle_hosts_are_evicted(monkeypatch):
+    monkeypatch.setattr(http_client, "_MAX_HOSTS", 4)
+    async with client(1, ok) as c:
+        for i in range(20):
+            await c.get(f"http://h{i}.test/")
+        transport = c._transport
+        assert len(transport._hosts) <= 4
+        assert transport._users == {}
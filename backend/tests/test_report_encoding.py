@@ -0,0 +1,18 @@
+import pytest
+from app.main import _pick_encoding
+
+AVAILABLE = ["zstd", "gzip"]
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip, deflate, br, zstd", "zstd"),
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("zstd;q=0, gzip", "gzip"),
+    ("zstd;q=0.5, gzip;q=0.8", "gzip"),
+    ("*", "zstd"),
+    ("*;q=0, gzip", "gzip"),
+    ("identity", None),
+    ("", None),
+])
+def test_pick_encoding(accept, expected):
+    assert _pick_encoding(accept, AVAILABLE) == expected
@@ -0,0 +1,40 @@
+import pytest
+from app.storage import db
+from app.storage.runs import RunStore, SqliteRunStore
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "memory":
+        return RunStore()
+    monkeypatch.setattr(db, "DATA_DIR", tmp_path)
+    return SqliteRunStore("runs-test.db")
+
+def walk(store, **filters):
+    ids, cursor = [], None
+    while True:
+        runs, cursor = store.page(limit=2, cursor=cursor, **filters)
+        ids += [r.run_id for r in runs]
+        if cursor is None:
+            return ids
+
+def test_keyset_pages_cover_every_run_once_newest_first(store):
+    created = [store.create(topic=f"topic {i}").run_id for i in range(5)]
+    assert walk(store) == created[::-1]
+
+def test_exact_page_has_no_cursor(store):
+    for _ in range(2):
+        store.create()
+    runs, cursor = store.page(limit=2)
+    assert len(runs) == 2 and cursor is None
+
+def test_filters_apply_across_pages(store):
+    created = [store.create(topic="Boomerang %d" % i if i % 2 else "other").run_id for i in range(6)]
+    store.finish(created[1])
+    assert walk(store, topic="boomerang") == [created[5], created[3], created[1]]
+    assert walk(store, status="completed") == [created[1]]
+
+@pytest.mark.parametrize("cursor", ["!!!", "abcd"])
+def test_malformed_cursor_is_rejected(store, cursor):
+    store.create()
+    with pytest.raises(ValueError):
+        store.page(cursor=cursor)
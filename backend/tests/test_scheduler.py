@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+from app.config import settings
+from app.scheduler import QueueFull, RunScheduler
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(settings, "RUN_WORKERS", 1)
+    monkeypatch.setattr(settings, "RUN_QUEUE_MAX", 5)
+    return RunScheduler()
+
+async def test_priority_then_round_robin(scheduler):
+    ran, gate = [], asyncio.Event()
+
+    async def job(run_id):
+        if run_id == "block":
+            await gate.wait()
+        ran.append(run_id)
+
+    await scheduler.submit("block", "deep", "x", lambda: job("block"))
+    await asyncio.sleep(0.01)  # the only worker is now busy
+    for run_id, depth, client in [("a1", "deep", "a"), ("a2", "deep", "a"), ("b1", "deep", "b"),
+                                  ("q1", "quick", "a"), ("s1", "standard", "c")]:
+        await scheduler.submit(run_id, depth, client, lambda run_id=run_id: job(run_id))
+
+    expected = ["q1", "s1", "a1", "b1", "a2"]
+    assert [scheduler.position(r) for r in expected] == [1, 2, 3, 4, 5]
+    with pytest.raises(QueueFull):
+        await scheduler.submit("z", "quick", "z", lambda: job("z"))
+
+    gate.set()
+    await asyncio.sleep(0.05)
+    assert ran == ["block"] + expected
+    assert await scheduler.stop() == []
+
+async def test_stop_returns_pending_runs(scheduler):
+    gate = asyncio.Event()
+    await scheduler.submit("block", "deep", "x", gate.wait)
+    await asyncio.sleep(0.01)
+    await scheduler.submit("p1", "quick", "x", gate.wait)
+    assert await scheduler.stop() == ["p1"]
+    assert scheduler.position("p1") is None
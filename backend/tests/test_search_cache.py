@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+from app.config import settings
+from app.tools.search_providers.cache import SearchCache
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_CACHE_TTL", 3600)
+    monkeypatch.setattr(settings, "SEARCH_CACHE_SQLITE", False)
+    return SearchCache()
+
+def slow_fetch(calls):
+    async def fetch():
+        calls.append("started")
+        await asyncio.sleep(0.05)
+        calls.append("finished")
+        return [{"url": "https://example.com/"}]
+    return fetch
+
+async def test_concurrent_misses_share_one_call(cache):
+    calls = []
+    a, b = await asyncio.gather(*(cache.get_or_fetch("p", "k", slow_fetch(calls)) for _ in range(2)))
+    assert a == b and calls == ["started", "finished"]
+
+async def test_cancelled_caller_still_fills_the_cache(cache):
+    calls = []
+    waiter = asyncio.ensure_future(cache.get_or_fetch("p", "k", slow_fetch(calls)))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    await asyncio.sleep(0.1)
+    assert calls == ["started", "finished"]
+    assert await cache.get("k") == [{"url": "https://example.com/"}]
+
+async def test_abandoned_call_is_cancelled_and_forgotten(cache):
+    calls = []
+    waiter = asyncio.ensure_future(cache.get_or_fetch("p", "k", slow_fetch(calls), abandonable=True))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    assert "k" not in cache._inflight
+    assert await cache.get_or_fetch("p", "k", slow_fetch(calls)) == [{"url": "https://example.com/"}]
+    assert calls == ["started", "started", "finished"]
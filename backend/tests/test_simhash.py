@@ -0,0 +1,21 @@
+from app.tools.simhash import hamming, simhash
+
+BASE = "the quick brown fox jumps over the lazy dog while the farmer watches " * 40
+
+def test_identical_text_has_identical_fingerprint():
+    assert simhash(BASE) == simhash(BASE)
+    assert hamming(simhash(BASE), simhash(BASE)) == 0
+
+def test_near_duplicate_is_close():
+    assert hamming(simhash(BASE), simhash(BASE + " plus a short footer")) <= 3
+
+def test_different_text_is_far():
+    other = "boomerangs return because of gyroscopic precession and lift on the wings " * 40
+    assert hamming(simhash(BASE), simhash(other)) > 10
+
+def test_empty_text():
+    assert simhash("") == 0
+
+def test_hamming():
+    assert hamming(0b1011, 0b0001) == 2
+    assert hamming(0, (1 << 64) - 1) == 64
@@ -0,0 +1,25 @@
+import pytest
+from app.storage import db, tiered_cache
+from app.storage.tiered_cache import TieredCache
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DATA_DIR", tmp_path)
+
+def make(ttl=lambda: 60.0):
+    return TieredCache("cache-test.db", "entries", ttl=ttl, max_entries=lambda: 10, persistent=lambda: True)
+
+async def test_disk_tier_survives_a_new_instance():
+    await make().aput("k", {"v": 1})
+    assert await make().aget("k") == {"v": 1}
+    assert await make().aget("missing") is None
+
+async def test_expired_rows_are_pruned_on_write(monkeypatch):
+    ttl = [-1.0]
+    cache = make(ttl=lambda: ttl[0])
+    await cache.aput("old", 1)
+    ttl[0] = 60.0
+    monkeypatch.setattr(tiered_cache, "_PRUNE_EVERY_S", 0)
+    await cache.aput("new", 2)
+    rows = cache._db().execute("SELECT key FROM entries").fetchall()
+    assert [r["key"] for r in rows] == ["new"]
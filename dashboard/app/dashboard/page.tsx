@@ -101,7 +101,7 @@ export default function DashboardPage() {
 
   const fetchRuns = useCallback(async () => {
     try {
-      const r = await fetch(`${backend}/runs`, { cache: 'no-store' });
+      const r = await fetch(`${backend}/runs?limit=20`, { cache: 'no-store' });
       const j = await r.json();
       setRuns(Array.isArray(j) ? j : []);
     } catch {
@@ -258,7 +258,7 @@ export default function DashboardPage() {
       if (!map.has(e.step)) map.set(e.step, []);
       map.get(e.step)!.push(e);
     }
-    const order = ['plan', 'search', 'retrieve', 'summarize', 'synthesize', 'critique', 'present', 'run'];
+    const order = ['plan', 'search', 'rank', 'retrieve', 'summarize', 'synthesize', 'critique', 'present', 'run'];
     return order
       .filter((s) => map.has(s))
       .map((s) => {